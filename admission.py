@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import OrderedDict
+
+from utils import env_number
+
+# Admission control in front of the analysis job queue. Every request must
+# get a Ticket before its job is submitted:
+#   - per-client token bucket (rate limit); app.py keys clients by address,
+#     from X-Forwarded-For when RESUMIFY_TRUST_FORWARDED_FOR is set (only
+#     behind a reverse proxy), else the connection's IP, else the session
+#   - at most max_concurrent analyses running and max_queue waiting, beyond
+#     that requests are rejected with a retry-after estimate
+#   - as the wait queue fills, admitted requests are degraded: first the
+#     PDF report is skipped, then the job-description match
+# Wait estimates use an EWMA of observed service times.
+
+
+class Ticket:
+    """
+    Outcome of an admission request
+    """
+
+    def __init__(self, accepted, reason=None, retry_after=0.0, estimated_wait=0.0,
+                 skip_pdf_report=False, skip_job_match=False):
+        self.accepted = accepted
+        self.reason = reason
+        self.retry_after = retry_after
+        self.estimated_wait = estimated_wait
+        self.skip_pdf_report = skip_pdf_report
+        self.skip_job_match = skip_job_match
+        self.admitted_at = time.monotonic()
+        self.started_at = None
+        self._controller = None
+        self._released = False
+
+    @property
+    def degraded(self):
+        return self.skip_pdf_report or self.skip_job_match
+
+    def release(self):
+        """
+        Give the slot back; safe to call more than once
+        """
+        if self._controller is not None:
+            self._controller._release(self)
+
+
+class _TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self):
+        """
+        Take one token; returns seconds until one is available (0 if taken)
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+class AdmissionController:
+    """
+    Concurrency limit, bounded queue, per-client rate limit and load shedding
+    """
+
+    def __init__(self, max_concurrent=None, max_queue=None, client_rate=None, client_burst=None,
+                 shed_report_at=0.0, shed_match_at=0.5, max_clients=10000):
+        self.max_concurrent = max_concurrent or env_number("RESUMIFY_MAX_CONCURRENT", 4, int)
+        self.max_queue = max_queue if max_queue is not None else env_number("RESUMIFY_MAX_QUEUE", 16, int)
+        # Sustained analyses per second per client, and how many may burst
+        self.client_rate = client_rate if client_rate is not None else env_number("RESUMIFY_CLIENT_RATE", 0.2)
+        self.client_burst = client_burst if client_burst is not None else env_number("RESUMIFY_CLIENT_BURST", 3)
+        # Queue fill (0-1) above which reports / job matching are skipped
+        self.shed_report_at = shed_report_at
+        self.shed_match_at = shed_match_at
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._service_ewma = 2.0
+        self._buckets = OrderedDict()
+        self.rejected = 0
+        self.degraded = 0
+
+    def _queued(self, in_flight):
+        return max(0, in_flight - self.max_concurrent)
+
+    def _wait_for(self, queued_ahead):
+        # Each running slot frees up about once per service time
+        return queued_ahead * self._service_ewma / self.max_concurrent
+
+    def estimated_wait(self):
+        """
+        Expected queueing delay for a request arriving now
+        """
+        with self._lock:
+            if self._in_flight < self.max_concurrent:
+                return 0.0
+            return self._wait_for(self._queued(self._in_flight) + 1)
+
+    def load(self):
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "running": min(self._in_flight, self.max_concurrent),
+                "queued": self._queued(self._in_flight),
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "service_ewma_s": self._service_ewma,
+                "rejected": self.rejected,
+                "degraded": self.degraded
+            }
+
+    def admit(self, client_id):
+        """
+        Decide whether a request may enter the pipeline, and in what form
+        """
+        with self._lock:
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                bucket = _TokenBucket(self.client_rate, self.client_burst)
+                self._buckets[client_id] = bucket
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(client_id)
+
+            retry_after = bucket.take()
+            if retry_after > 0:
+                self.rejected += 1
+                return Ticket(False, reason="rate_limited", retry_after=retry_after)
+
+            if self._in_flight >= self.max_concurrent + self.max_queue:
+                self.rejected += 1
+                # The client's token is refunded, the rejection wasn't their doing
+                bucket.tokens = min(bucket.burst, bucket.tokens + 1)
+                return Ticket(False, reason="overloaded", retry_after=self._wait_for(self.max_queue + 1))
+
+            self._in_flight += 1
+            queued = self._queued(self._in_flight)
+            pressure = queued / self.max_queue if self.max_queue else (1.0 if queued else 0.0)
+            ticket = Ticket(
+                True,
+                estimated_wait=self._wait_for(queued),
+                skip_pdf_report=queued > 0 and pressure > self.shed_report_at,
+                skip_job_match=queued > 0 and pressure >= self.shed_match_at
+            )
+            if ticket.degraded:
+                self.degraded += 1
+            ticket._controller = self
+            return ticket
+
+    def _release(self, ticket):
+        with self._lock:
+            if ticket._released:
+                return
+            ticket._released = True
+            self._in_flight -= 1
+            if ticket.started_at is not None:
+                service = time.monotonic() - ticket.started_at
+                self._service_ewma = 0.8 * self._service_ewma + 0.2 * service
+
+    def wrap(self, ticket, fn):
+        """
+        Wrap a job function so the ticket records when service actually starts
+        """
+        def run(job, *args, **kwargs):
+            ticket.started_at = time.monotonic()
+            return fn(job, *args, **kwargs)
+        return run
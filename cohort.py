@@ -0,0 +1,123 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from utils import SKILL_MAP, all_skills
+
+# Cohort skill-gap analytics. A batch of resumes becomes one sparse
+# resume x skill presence matrix over the whole SKILL_MAP; coverage, gaps
+# per role and co-occurrence are then column reductions / one sparse
+# product instead of per-resume, per-skill Python loops.
+
+
+def skill_matrix(texts, skills=None):
+    """
+    Sparse (n_resumes, n_skills) 0/1 matrix of skill presence.
+    Uses the same case-insensitive substring rule as the single-resume
+    analysis, evaluated one skill at a time across the whole batch.
+    """
+    skills = skills or all_skills()
+    lowered = pd.Series(list(texts), dtype=object).fillna("").str.lower()
+    rows, cols = [], []
+    for col, skill in enumerate(skills):
+        hits = np.flatnonzero(lowered.str.contains(skill.lower(), regex=False).to_numpy())
+        rows.append(hits)
+        cols.append(np.full(len(hits), col))
+    rows = np.concatenate(rows) if rows else np.array([], dtype=int)
+    cols = np.concatenate(cols) if cols else np.array([], dtype=int)
+    data = np.ones(len(rows), dtype=np.int32)
+    return sp.csr_matrix((data, (rows, cols)), shape=(len(lowered), len(skills)))
+
+
+def cohort_report(texts, roles, top_n=5, min_support=5):
+    """
+    Aggregate skill statistics for a batch of resumes.
+
+    roles gives the role each resume is assessed against (its category or
+    target role); resumes whose role isn't in SKILL_MAP only count towards
+    overall coverage and co-occurrence. Returns a dict of DataFrames:
+    coverage, role_gaps, top_gaps and cooccurrence.
+    """
+    skills = all_skills()
+    skill_index = {skill: i for i, skill in enumerate(skills)}
+    X = skill_matrix(texts, skills)
+    roles = np.asarray(list(roles), dtype=object)
+    n = X.shape[0]
+
+    counts = np.asarray(X.sum(axis=0)).ravel()
+    coverage = pd.DataFrame({
+        "skill": skills,
+        "resumes": counts,
+        "coverage": counts / n if n else 0.0
+    }).sort_values("coverage", ascending=False, ignore_index=True)
+
+    gap_frames = []
+    for role, groups in SKILL_MAP.items():
+        mask = roles == role
+        n_role = int(mask.sum())
+        if not n_role:
+            continue
+        columns = [skill_index[skill] for skill_list in groups.values() for skill in skill_list]
+        tiers = [tier for tier, skill_list in groups.items() for _ in skill_list]
+        present = np.asarray(X[mask][:, columns].sum(axis=0)).ravel()
+        gap_frames.append(pd.DataFrame({
+            "role": role,
+            "skill": [skills[c] for c in columns],
+            "tier": tiers,
+            "resumes": n_role,
+            "gap_rate": 1 - present / n_role
+        }))
+    role_gaps = pd.concat(gap_frames, ignore_index=True) if gap_frames else pd.DataFrame(
+        columns=["role", "skill", "tier", "resumes", "gap_rate"]
+    )
+    top_gaps = (
+        role_gaps.sort_values(["role", "gap_rate"], ascending=[True, False])
+        .groupby("role", sort=False).head(top_n).reset_index(drop=True)
+    )
+
+    # Upper triangle of X^T X: how often each pair of skills appears together
+    co = sp.triu(X.T @ X, k=1).tocoo()
+    keep = co.data >= min_support
+    a, b, together = co.row[keep], co.col[keep], co.data[keep]
+    cooccurrence = pd.DataFrame({
+        "skill_a": [skills[i] for i in a],
+        "skill_b": [skills[j] for j in b],
+        "resumes": together,
+        # P(b | a) and P(a | b)
+        "p_b_given_a": together / counts[a],
+        "p_a_given_b": together / counts[b],
+        "lift": together * n / (counts[a] * counts[b])
+    }).sort_values("resumes", ascending=False, ignore_index=True)
+
+    return {
+        "coverage": coverage,
+        "role_gaps": role_gaps,
+        "top_gaps": top_gaps,
+        "cooccurrence": cooccurrence
+    }
+
+
+def export_report(report, out_dir):
+    """
+    Write each aggregate table of a cohort report to <out_dir>/<name>.csv
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name, frame in report.items():
+        path = os.path.join(out_dir, f"{name}.csv")
+        frame.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "data/UpdatedResumeDataSet.csv"
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else "reports/cohort"
+    df = pd.read_csv(csv_path)
+    report = cohort_report(df["Resume"], df["Category"])
+    for path in export_report(report, out_dir):
+        print(f"Wrote {path}")
+    print(report["top_gaps"].to_string(index=False))
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Columnar cache of the cleaned training corpus. The raw CSV stays the
+# source of truth; the cache stores cleaned text, labels and a content hash
+# per row in a compressed .npz so training runs skip parsing and cleaning.
+
+RAW_CSV = "data/UpdatedResumeDataSet.csv"
+CACHE_PATH = "data/cache/resumes.npz"
+
+# Bump when clean_text changes so every cached row gets re-cleaned
+CLEANER_VERSION = 1
+
+
+def clean_text(text):
+    """
+    Enhanced text cleaning for resume data
+    """
+    if not isinstance(text, str):
+        return ""
+
+    # Remove URLs
+    text = re.sub(r'http\S+|www\S+|https\S+', '', text)
+
+    # Remove special characters but keep important punctuation for skills
+    text = re.sub(r'[^a-zA-Z0-9\s.,!?()\-\+&/]', ' ', text)
+
+    # Remove extra whitespace
+    text = re.sub(r'\s+', ' ', text)
+
+    # Convert to lowercase
+    text = text.lower()
+
+    return text.strip()
+
+
+def row_hash(category, resume):
+    """
+    Content hash of one raw row, tied to the cleaner version
+    """
+    key = f"{CLEANER_VERSION}\0{category}\0{resume if isinstance(resume, str) else ''}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _pack_strings(values):
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(buffer, offsets):
+    raw = buffer.tobytes()
+    return [raw[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return np.array([stat.st_size, stat.st_mtime_ns, CLEANER_VERSION], dtype=np.int64)
+
+
+def _read_cache(cache_path):
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            return {key: cache[key] for key in cache.files}
+    except (OSError, ValueError, KeyError):
+        # Corrupt or from an incompatible version: rebuild from the CSV
+        return None
+
+
+def _cache_to_frame(cache):
+    categories = _unpack_strings(cache["category_buffer"], cache["category_offsets"])
+    # pd.factorize labels a missing Category -1, which picks the trailing NaN
+    names = np.array(categories + [np.nan], dtype=object)
+    return pd.DataFrame({
+        "Category": names[cache["labels"]],
+        "Cleaned_Resume": _unpack_strings(cache["text_buffer"], cache["text_offsets"]),
+        "Hash": cache["hashes"].astype(str)
+    })
+
+
+def build_dataset(csv_path=RAW_CSV, cache_path=CACHE_PATH, verbose=True):
+    """
+    Convert the raw CSV into the columnar cache, re-cleaning only rows whose
+    content hash is not already cached. Returns the dataset as a DataFrame.
+    """
+    previous = _read_cache(cache_path)
+    cleaned_by_hash = {}
+    if previous is not None:
+        previous_df = _cache_to_frame(previous)
+        cleaned_by_hash = dict(zip(previous_df["Hash"], previous_df["Cleaned_Resume"]))
+
+    df = pd.read_csv(csv_path)
+    hashes = [row_hash(c, r) for c, r in zip(df["Category"], df["Resume"])]
+
+    cleaned = []
+    reused = 0
+    for h, resume in zip(hashes, df["Resume"]):
+        if h in cleaned_by_hash:
+            cleaned.append(cleaned_by_hash[h])
+            reused += 1
+        else:
+            cleaned.append(clean_text(resume))
+            cleaned_by_hash[h] = cleaned[-1]
+
+    if verbose:
+        print(f"Dataset: {len(df)} rows, {reused} reused from cache, {len(df) - reused} cleaned")
+
+    labels, category_names = pd.factorize(df["Category"])
+    text_buffer, text_offsets = _pack_strings(cleaned)
+    category_buffer, category_offsets = _pack_strings(list(category_names))
+
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp_path = cache_path + ".tmp.npz"
+    np.savez_compressed(
+        tmp_path,
+        source_stamp=_source_stamp(csv_path),
+        hashes=np.array(hashes, dtype="S40"),
+        labels=labels.astype(np.int32),
+        text_buffer=text_buffer,
+        text_offsets=text_offsets,
+        category_buffer=category_buffer,
+        category_offsets=category_offsets
+    )
+    os.replace(tmp_path, cache_path)
+
+    return pd.DataFrame({"Category": df["Category"], "Cleaned_Resume": cleaned, "Hash": hashes})
+
+
+def load_dataset(csv_path=RAW_CSV, cache_path=CACHE_PATH, verbose=True):
+    """
+    Load the cleaned dataset, straight from the cache when the CSV is
+    unchanged since the cache was built, otherwise via build_dataset()
+    """
+    cache = _read_cache(cache_path)
+    if cache is not None and np.array_equal(cache.get("source_stamp"), _source_stamp(csv_path)):
+        if verbose:
+            print(f"Dataset: loaded {len(cache['hashes'])} cleaned rows from {cache_path}")
+        return _cache_to_frame(cache)
+    return build_dataset(csv_path, cache_path, verbose=verbose)
+
+
+if __name__ == "__main__":
+    build_dataset(*sys.argv[1:3])
@@ -0,0 +1,82 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Per-term explanations for linear classifiers over TF-IDF features.
+# For a linear model the decision value of class k is
+#     sum_j x_j * coef_[k, j] + intercept_[k]
+# so each nonzero TF-IDF entry's contribution is exact, and explaining a
+# resume costs one pass over its nonzero entries - about one prediction.
+
+
+@lru_cache(maxsize=4)
+def _feature_names(tfidf):
+    return tfidf.get_feature_names_out()
+
+
+def _class_weights(clf, role):
+    """
+    coef_ row and intercept for a role, or None if the model doesn't know it
+    """
+    classes = list(clf.classes_)
+    if role not in classes:
+        return None
+    index = classes.index(role)
+    coef = clf.coef_
+    intercept = np.ravel(clf.intercept_)
+    if coef.shape[0] == 1:
+        # Binary models keep a single row for classes_[1]
+        sign = 1.0 if index == 1 else -1.0
+        return sign * coef[0], sign * intercept[0]
+    return coef[index], intercept[index]
+
+
+def _explain_row(indices, values, weights, names, top_n):
+    coef, intercept = weights
+    contributions = values * coef[indices]
+    order = np.argsort(contributions)
+    positive = [(names[indices[i]], float(contributions[i])) for i in order[::-1][:top_n] if contributions[i] > 0]
+    negative = [(names[indices[i]], float(contributions[i])) for i in order[:top_n] if contributions[i] < 0]
+    return {
+        "score": float(contributions.sum() + intercept),
+        "positive": positive,
+        "negative": negative
+    }
+
+
+def explain_predictions(vectors, clf, tfidf, predicted_roles, target_roles=None, top_n=5):
+    """
+    Explain a batch of predictions from their sparse TF-IDF rows.
+
+    Returns one dict per row with "predicted" and "target" entries, each
+    holding the role, its decision score and the top positive / negative
+    (term, contribution) pairs. "target" is None when there is no target
+    role, it matches the prediction, or the model doesn't know it.
+    """
+    vectors = vectors.tocsr()
+    names = _feature_names(tfidf)
+    if target_roles is None:
+        target_roles = [None] * vectors.shape[0]
+
+    explanations = []
+    for row, (predicted, target) in enumerate(zip(predicted_roles, target_roles)):
+        start, end = vectors.indptr[row], vectors.indptr[row + 1]
+        indices, values = vectors.indices[start:end], vectors.data[start:end]
+
+        explanation = {"predicted": None, "target": None}
+        for key, role in (("predicted", predicted), ("target", target)):
+            if role is None or (key == "target" and role == predicted):
+                continue
+            weights = _class_weights(clf, role)
+            if weights is None:
+                continue
+            explanation[key] = dict(role=role, **_explain_row(indices, values, weights, names, top_n))
+        explanations.append(explanation)
+    return explanations
+
+
+def explain_prediction(vector, clf, tfidf, predicted_role, target_role=None, top_n=5):
+    """
+    Explain a single prediction, see explain_predictions()
+    """
+    return explain_predictions(vector, clf, tfidf, [predicted_role], [target_role], top_n=top_n)[0]
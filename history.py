@@ -0,0 +1,269 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# Embedded store of every analysis. Writes are buffered in memory and
+# flushed by a background thread as one executemany() transaction when the
+# batch fills up or every flush_interval seconds, so record() never touches
+# disk.
+# Only hashes of the resume and posting text are stored, never the text.
+# The store is best effort: if the database can't be created or written,
+# the error is logged, the rows stay buffered (up to max_buffer) for the next
+# flush, and the analysis that produced them is unaffected.
+
+HISTORY_DB = os.environ.get("RESUMIFY_HISTORY_DB", "data/history.sqlite3")
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    candidate_hash TEXT NOT NULL,
+    posting_hash TEXT,
+    target_role TEXT NOT NULL,
+    predicted_role TEXT NOT NULL,
+    role_match INTEGER NOT NULL,
+    effectiveness REAL NOT NULL,
+    skill_score REAL NOT NULL,
+    desc_score REAL NOT NULL,
+    present_skills TEXT NOT NULL,
+    missing_skills TEXT NOT NULL,
+    model_version TEXT,
+    analysis_ms REAL,
+    total_ms REAL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_role_time ON analyses (target_role, created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_time ON analyses (created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_candidate ON analyses (candidate_hash, created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_posting ON analyses (posting_hash, created_at);
+"""
+
+COLUMNS = (
+    "created_at", "candidate_hash", "posting_hash", "target_role", "predicted_role", "role_match",
+    "effectiveness", "skill_score", "desc_score", "present_skills", "missing_skills",
+    "model_version", "analysis_ms", "total_ms"
+)
+
+GROUP_COLUMNS = ("target_role", "predicted_role", "model_version", "posting_hash")
+
+
+def text_hash(text):
+    """
+    Stable hash of a text, insensitive to case and whitespace changes
+    """
+    if not text or not text.strip():
+        return None
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+class AnalysisHistory:
+    """
+    Buffered SQLite writer plus indexed read queries
+    """
+
+    def __init__(self, path=HISTORY_DB, batch_size=50, flush_interval=5.0, max_buffer=5000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._flush_requested = threading.Event()
+        self._ready = False
+        # No early flush requests before this time after a failed write
+        self._retry_at = 0.0
+
+        try:
+            self._ensure_schema()
+        except (OSError, sqlite3.Error) as e:
+            log.warning("History store %s unavailable, will retry on flush: %s", path, e)
+
+        self._flusher = threading.Thread(target=self._flush_periodically, name="resumify-history", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_schema(self):
+        if self._ready:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self._ready = True
+
+    def record(self, analysis_data, resume_text, posting_text="", model_version=None, total_ms=None):
+        """
+        Buffer one analysis; a full batch wakes the flusher thread.
+        Never raises for store errors.
+        """
+        # skills_missing is cut for display, the store keeps every gap
+        missing_skills = [skill for skill in analysis_data["required_skills"]
+                          if skill not in analysis_data["present_skills"]]
+        row = (
+            time.time(),
+            text_hash(resume_text) or "",
+            text_hash(posting_text),
+            analysis_data["target_role"],
+            str(analysis_data["predicted_role"]),
+            int(bool(analysis_data["role_match"])),
+            float(analysis_data["effectiveness"]),
+            float(analysis_data["skill_match_percentage"]),
+            float(analysis_data["desc_score"]),
+            json.dumps(list(analysis_data["present_skills"])),
+            json.dumps(missing_skills),
+            model_version,
+            analysis_data.get("analysis_ms"),
+            total_ms
+        )
+        with self._lock:
+            self._buffer.append(row)
+            self._trim_buffer()
+            full = len(self._buffer) >= self.batch_size
+        if full and time.monotonic() >= self._retry_at:
+            self._flush_requested.set()
+
+    def flush(self):
+        """
+        Write all buffered rows in a single transaction. On failure the rows
+        go back into the buffer and the error is raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+            try:
+                self._ensure_schema()
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.executemany(
+                            f"INSERT INTO analyses ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                            rows
+                        )
+                finally:
+                    conn.close()
+            except (OSError, sqlite3.Error):
+                self._requeue(rows)
+                self._retry_at = time.monotonic() + self.flush_interval
+                raise
+            return len(rows)
+
+    def _trim_buffer(self):
+        # While the store is failing, keep only the newest max_buffer rows
+        overflow = len(self._buffer) - self.max_buffer
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+
+    def _requeue(self, rows):
+        with self._lock:
+            self._buffer = rows + self._buffer
+            self._trim_buffer()
+
+    def _flush_logged(self):
+        try:
+            self.flush()
+        except (OSError, sqlite3.Error) as e:
+            log.warning("History write to %s failed, %d rows buffered (%d dropped so far): %s",
+                        self.path, len(self._buffer), self.dropped, e)
+
+    def _flush_periodically(self):
+        while not self._stop_event.is_set():
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            if self._stop_event.is_set():
+                break
+            self._flush_logged()
+
+    def close(self):
+        self._stop_event.set()
+        self._flush_requested.set()
+        self._flush_logged()
+
+    def _where(self, target_role=None, candidate_hash=None, posting_hash=None, since=None, until=None):
+        clauses, params = [], []
+        for column, value in (("target_role", target_role), ("candidate_hash", candidate_hash),
+                              ("posting_hash", posting_hash)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, target_role=None, candidate_hash=None, posting_hash=None, since=None, until=None, limit=500):
+        """
+        Recent analyses matching the filters, newest first.
+        since/until are Unix timestamps.
+        """
+        self.flush()
+        where, params = self._where(target_role, candidate_hash, posting_hash, since, until)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT * FROM analyses{where} ORDER BY created_at DESC LIMIT ?", params + [limit]
+            ).fetchall()
+        finally:
+            conn.close()
+        results = []
+        for row in rows:
+            item = dict(row)
+            item["present_skills"] = json.loads(item["present_skills"])
+            item["missing_skills"] = json.loads(item["missing_skills"])
+            results.append(item)
+        return results
+
+    def aggregate(self, group_by="target_role", target_role=None, posting_hash=None, since=None, until=None):
+        """
+        Count, mean effectiveness and role match rate per group
+        """
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Can't group by '{group_by}', expected one of {GROUP_COLUMNS}")
+        self.flush()
+        where, params = self._where(target_role, None, posting_hash, since, until)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT {group_by} AS grp, COUNT(*) AS analyses, AVG(effectiveness) AS mean_effectiveness, "
+                f"AVG(role_match) AS role_match_rate, AVG(total_ms) AS mean_total_ms "
+                f"FROM analyses{where} GROUP BY {group_by} ORDER BY analyses DESC",
+                params
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_history():
+    """
+    Process-wide history store
+    """
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = AnalysisHistory()
+        return _history
@@ -0,0 +1,151 @@
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import time
+
+import PyPDF2
+
+from utils import env_number
+
+# Upload ingestion with byte/page/time budgets. Uploads above the spool
+# threshold are streamed to a temp file in chunks and parsed through a
+# read-only memory map, so the worker never holds extra copies in RAM.
+# In the app, Streamlit has already buffered the upload by the time
+# spool_upload() runs; .streamlit/config.toml caps it at the same size.
+#
+# The time budget is checked between pages, so it can't interrupt a single
+# slow page: that page keeps its process pool worker busy until it is
+# parsed, even after run_cpu() has given up on it.
+
+MB = 1024 * 1024
+CHUNK_SIZE = 256 * 1024
+
+
+class IngestLimits:
+    """
+    Budgets applied to every upload, overridable with RESUMIFY_* env vars
+    """
+
+    def __init__(self, max_bytes=None, max_pages=None, max_seconds=None,
+                 spool_threshold=None, truncate=True):
+        self.max_bytes = max_bytes if max_bytes is not None else int(env_number("RESUMIFY_MAX_UPLOAD_MB", 10) * MB)
+        self.max_pages = max_pages if max_pages is not None else env_number("RESUMIFY_MAX_PAGES", 20, int)
+        self.max_seconds = max_seconds if max_seconds is not None else env_number("RESUMIFY_MAX_PARSE_SECONDS", 15)
+        self.spool_threshold = spool_threshold if spool_threshold is not None else 1 * MB
+        # Over page/time budget: keep what was read so far instead of rejecting
+        self.truncate = truncate
+
+
+class UploadRejected(ValueError):
+    pass
+
+
+class SpooledUpload:
+    """
+    An upload held either in memory (small) or in a temp file (large).
+    Picklable, so it can be handed to job worker processes.
+    """
+
+    def __init__(self, size, data=None, path=None, digest=None):
+        self.size = size
+        self.data = data
+        self.path = path
+        # Content hash, lets callers cache per-document work across uploads
+        self.digest = digest
+
+    def open(self):
+        """
+        Return a seekable stream over the upload without copying it
+        """
+        if self.path is None:
+            return io.BytesIO(self.data)
+        with open(self.path, "rb") as f:
+            if self.size == 0:
+                return io.BytesIO(b"")
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """
+        Remove the spool file, if any
+        """
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+        self.data = None
+
+
+def spool_upload(fileobj, limits=None):
+    """
+    Copy an uploaded file object into a SpooledUpload, rejecting it as soon
+    as it exceeds the byte budget
+    """
+    limits = limits or IngestLimits()
+
+    # Streamlit's UploadedFile knows its size up front
+    declared_size = getattr(fileobj, "size", None)
+    if declared_size is not None and declared_size > limits.max_bytes:
+        raise UploadRejected(
+            f"File is {declared_size / MB:.1f} MB, the limit is {limits.max_bytes / MB:.0f} MB"
+        )
+
+    fileobj.seek(0)
+    if declared_size is not None and declared_size <= limits.spool_threshold:
+        data = fileobj.read(limits.max_bytes + 1)
+        if len(data) > limits.max_bytes:
+            raise UploadRejected(f"File is larger than {limits.max_bytes / MB:.0f} MB")
+        return SpooledUpload(len(data), data=data, digest=hashlib.sha1(data).hexdigest())
+
+    fd, path = tempfile.mkstemp(suffix=".pdf", prefix="resumify-upload-")
+    size = 0
+    digest = hashlib.sha1()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = fileobj.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > limits.max_bytes:
+                    raise UploadRejected(f"File is larger than {limits.max_bytes / MB:.0f} MB")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return SpooledUpload(size, path=path, digest=digest.hexdigest())
+
+
+def extract_pdf_text(upload, limits=None):
+    """
+    Extract text page by page within the page and time budgets.
+    Returns (text, notes) where notes describe any truncation.
+    """
+    limits = limits or IngestLimits()
+    notes = []
+    started = time.monotonic()
+
+    stream = upload.open()
+    try:
+        reader = PyPDF2.PdfReader(stream)
+        page_count = len(reader.pages)
+        if page_count > limits.max_pages:
+            if not limits.truncate:
+                raise UploadRejected(f"PDF has {page_count} pages, the limit is {limits.max_pages}")
+            notes.append(f"Only the first {limits.max_pages} of {page_count} pages were analyzed")
+
+        parts = []
+        for index in range(min(page_count, limits.max_pages)):
+            if time.monotonic() - started > limits.max_seconds:
+                if not limits.truncate:
+                    raise UploadRejected(f"PDF parsing exceeded {limits.max_seconds:.0f}s")
+                notes.append(f"Parsing stopped after {index} pages (time limit {limits.max_seconds:.0f}s)")
+                break
+            parts.append(reader.pages[index].extract_text() or "")
+        return "".join(parts), notes
+    finally:
+        stream.close()
@@ -0,0 +1,284 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+# In-process job queue, no external broker needed. Each job runs its
+# orchestration function on a thread pool (I/O, waiting, progress updates)
+# and hands CPU-bound steps to a shared process pool via job.run_cpu().
+#
+# The process pool is replaced whenever it breaks (a worker was killed, e.g.
+# by the OOM killer) and when a job times out or is cancelled while its task
+# is running: a started task can't be cancelled, so its workers are
+# terminated to actually free the CPU. Tasks of other jobs caught in a
+# replaced pool are resubmitted once to the new pool.
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMEOUT = "timeout"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED, TIMEOUT)
+
+# How often waiting steps wake up to look for cancellation / deadline
+POLL_INTERVAL = 0.1
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobTimeout(Exception):
+    pass
+
+
+class Job:
+    """
+    A unit of work tracked by ID, with progress and partial results
+    """
+
+    def __init__(self, queue, fn, args, kwargs, timeout=None, cleanup=None):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Waiting in queue"
+        self.partial = {}
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.timeout = timeout
+        self._queue = queue
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self._cleanup = cleanup
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def deadline(self):
+        if self.timeout is None:
+            return None
+        return self.submitted_at + self.timeout
+
+    def report(self, progress, message=None, **partial):
+        """
+        Publish progress (0-1), a status message and any partial results
+        """
+        self.check()
+        with self._lock:
+            self.progress = max(0.0, min(1.0, progress))
+            if message is not None:
+                self.message = message
+            self.partial.update(partial)
+
+    def check(self):
+        """
+        Raise if the job was cancelled or has run past its deadline
+        """
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+        if self.deadline is not None and time.time() > self.deadline:
+            raise JobTimeout()
+
+    def run_cpu(self, fn, *args, **kwargs):
+        """
+        Run fn in the process pool and wait for it, honouring cancel/timeout
+        """
+        self.check()
+        if self._queue._get_cpu_pool() is None:
+            return fn(*args, **kwargs)
+        try:
+            return self._run_in_pool(fn, args, kwargs)
+        except BrokenProcessPool:
+            # Either this task killed its worker or it was caught in a pool
+            # that broke or was recycled; one retry on a fresh pool
+            return self._run_in_pool(fn, args, kwargs)
+
+    def _run_in_pool(self, fn, args, kwargs):
+        pool = self._queue._get_cpu_pool()
+        try:
+            future = pool.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            self._queue._replace_cpu_pool(pool)
+            raise
+        while True:
+            try:
+                return future.result(timeout=POLL_INTERVAL)
+            except FutureTimeoutError:
+                try:
+                    self.check()
+                except (JobCancelled, JobTimeout):
+                    if not future.cancel():
+                        # Already running: terminate the workers to stop it
+                        self._queue._replace_cpu_pool(pool, terminate=True)
+                    raise
+            except BrokenProcessPool:
+                self._queue._replace_cpu_pool(pool)
+                raise
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def snapshot(self):
+        """
+        Thread-safe copy of the job state for the UI
+        """
+        with self._lock:
+            return {
+                "id": self.id,
+                "status": self.status,
+                "progress": self.progress,
+                "message": self.message,
+                "partial": dict(self.partial),
+                "result": self.result,
+                "error": self.error,
+                "submitted_at": self.submitted_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at
+            }
+
+    def _finish(self, status, result=None, error=None, message=None):
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            if message is not None:
+                self.message = message
+            if status == DONE:
+                self.progress = 1.0
+            self.finished_at = time.time()
+
+    def _run(self):
+        try:
+            self._execute()
+        finally:
+            if self._cleanup is not None:
+                self._cleanup()
+
+    def _execute(self):
+        try:
+            self.check()
+        except JobCancelled:
+            self._finish(CANCELLED, message="Cancelled")
+            return
+        except JobTimeout:
+            self._finish(TIMEOUT, error="Timed out while waiting in queue", message="Timed out")
+            return
+
+        with self._lock:
+            self.status = RUNNING
+            self.started_at = time.time()
+            self.message = "Running"
+
+        try:
+            result = self._fn(self, *self._args, **self._kwargs)
+        except JobCancelled:
+            self._finish(CANCELLED, message="Cancelled")
+        except JobTimeout:
+            self._finish(TIMEOUT, error=f"Timed out after {self.timeout:.0f}s", message="Timed out")
+        except Exception as e:
+            self._finish(FAILED, error=str(e), message="Failed")
+        else:
+            self._finish(DONE, result=result, message="Done")
+
+
+class JobQueue:
+    """
+    Local job queue with a thread pool for I/O and a process pool for CPU work.
+
+    Job functions are called as fn(job, *args, **kwargs) and use job.report(),
+    job.check() and job.run_cpu() to cooperate with the queue. Functions
+    sent to run_cpu() must be picklable (module-level).
+    """
+
+    def __init__(self, io_workers=4, cpu_workers=None, default_timeout=120, max_finished=256):
+        self.default_timeout = default_timeout
+        self.max_finished = max_finished
+        self._cpu_workers = cpu_workers if cpu_workers is not None else max(1, (multiprocessing.cpu_count() or 2) - 1)
+        self._io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="resumify-job")
+        self._cpu_pool = None
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_cpu_pool(self):
+        if self._cpu_workers == 0:
+            return None
+        with self._lock:
+            if self._cpu_pool is None:
+                # spawn, not fork: the host process (e.g. Streamlit) is multi-threaded
+                self._cpu_pool = ProcessPoolExecutor(
+                    max_workers=self._cpu_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._cpu_pool
+
+    def _replace_cpu_pool(self, pool, terminate=False):
+        """
+        Drop a broken or stuck pool; the next run_cpu() builds a fresh one
+        """
+        with self._lock:
+            if self._cpu_pool is not pool:
+                # Already replaced by another job
+                return
+            self._cpu_pool = None
+        if terminate:
+            for process in list((pool._processes or {}).values()):
+                process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fn, *args, timeout=None, cleanup=None, **kwargs):
+        """
+        Queue fn(job, *args, **kwargs) and return the job ID.
+        cleanup() runs once the job has finished, however it finished.
+        """
+        timeout = timeout if timeout is not None else self.default_timeout
+        job = Job(self, fn, args, kwargs, timeout=timeout, cleanup=cleanup)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict_finished()
+        self._io_pool.submit(job._run)
+        return job.id
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        """
+        Snapshot of the job state, or None for unknown/evicted IDs
+        """
+        job = self.get(job_id)
+        return job.snapshot() if job is not None else None
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return False
+        job.cancel()
+        return True
+
+    def pending_count(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status in (QUEUED, RUNNING))
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status not in FINISHED_STATES:
+                    job.cancel()
+        self._io_pool.shutdown(wait=wait)
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=wait)
@@ -0,0 +1,78 @@
+import itertools
+import os
+import re
+
+import scipy.sparse as sp
+
+from utils import env_number
+
+# Length budgets for resumes and job descriptions. Long texts are capped at
+# max_tokens words, split into chunks of chunk_tokens words, the chunks are
+# counted in one batch and the chunk count vectors pooled into one:
+#   "sum" - length-weighted sum, the same counts as the capped text as a whole
+#           (bar bigrams spanning a chunk boundary)
+#   "max" - per-term maximum over chunks, so a term repeated on every page
+#           weighs no more than its densest chunk
+# Everything downstream (clean_text, transform, skill checks) then works on
+# at most max_tokens words, which bounds the worst-case latency per request.
+
+POOLING_MODES = ("sum", "max")
+
+_WORD = re.compile(r"\S+")
+
+
+class LengthBudget:
+    """
+    Word caps and chunking for one kind of document, overridable with
+    RESUMIFY_* env vars
+    """
+
+    def __init__(self, max_tokens=None, chunk_tokens=None, pooling=None):
+        self.max_tokens = max_tokens if max_tokens is not None else env_number("RESUMIFY_MAX_TOKENS", 20000, int)
+        self.chunk_tokens = chunk_tokens if chunk_tokens is not None else env_number("RESUMIFY_CHUNK_TOKENS", 2000, int)
+        self.pooling = pooling or os.environ.get("RESUMIFY_POOLING", "sum")
+        if self.pooling not in POOLING_MODES:
+            raise ValueError(f"Unknown pooling '{self.pooling}', expected one of {POOLING_MODES}")
+
+
+def job_budget():
+    """
+    Budget for job descriptions, which are much shorter than resumes
+    """
+    return LengthBudget(max_tokens=env_number("RESUMIFY_MAX_JOB_TOKENS", 5000, int))
+
+
+def truncate_words(text, max_tokens):
+    """
+    Return (kept_text, total_words, kept_words). kept_text is the original
+    text cut after max_tokens words, whitespace preserved.
+    """
+    words = text.split()
+    if len(words) <= max_tokens:
+        return text, len(words), len(words)
+    if max_tokens <= 0:
+        return "", len(words), 0
+    # Only scan as far as the cap to find where to cut
+    last = next(itertools.islice(_WORD.finditer(text), max_tokens - 1, None))
+    return text[:last.end()], len(words), max_tokens
+
+
+def chunk_words(text, chunk_tokens):
+    """
+    Split text into chunks of at most chunk_tokens words
+    """
+    words = text.split()
+    return [" ".join(words[i:i + chunk_tokens]) for i in range(0, len(words), max(1, chunk_tokens))]
+
+
+def pool_counts(chunk_counts, pooling="sum"):
+    """
+    Pool a (n_chunks, n_terms) count matrix into a single 1 x n_terms row
+    """
+    if chunk_counts.shape[0] <= 1:
+        return sp.csr_matrix(chunk_counts)
+    if pooling == "max":
+        pooled = chunk_counts.max(axis=0)
+    else:
+        pooled = chunk_counts.sum(axis=0)
+    return sp.csr_matrix(pooled)
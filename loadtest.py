@@ -0,0 +1,380 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import resource
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils import SKILL_MAP
+
+# Load generator for the scoring pipeline.
+#
+# Traffic is a JSONL file, one request per line:
+#   {"offset": 0.42, "client_id": "recruiter-3", "role": "HR", "resume_text": "...",
+#    "job_desc": "...", "additional_job_info": ""}
+# "offset" is the arrival time in seconds from the start of the run; it is
+# used when replaying with --rate replay. "client_id" keys the per-client
+# rate limit (records without one each count as a new client). Records can
+# be synthesized from the training CSV (synth) or captured from real
+# sessions in the same format.
+#
+# Targets:
+#   "inprocess" - the same path as one app.py host: AdmissionController.admit,
+#                 then run_analysis_job on a JobQueue with its process pool.
+#                 Rejected and degraded requests are counted separately.
+#   http(s) URL - for an external HTTP front end only (this repo serves no
+#                 such endpoint): each record is POSTed as JSON and any 2xx
+#                 response counts as success.
+
+DEFAULT_TRAFFIC = "data/traffic.jsonl"
+RAW_CSV = "data/UpdatedResumeDataSet.csv"
+LOADTEST_HISTORY_DB = "data/loadtest-history.sqlite3"
+
+
+def synthesize_traffic(n, csv_path=RAW_CSV, rate=2.0, clients=20, seed=42):
+    """
+    Build n requests from real resumes, with the SKILL_MAP role mix, Poisson
+    arrivals at `rate` requests per second spread over `clients` recruiters
+    """
+    rng = random.Random(seed)
+    df = pd.read_csv(csv_path)
+    df = df[df["Category"].isin(SKILL_MAP)]
+    resumes_by_role = {role: group["Resume"].tolist() for role, group in df.groupby("Category")}
+    # Weight roles by how often they occur in the dataset
+    roles = list(resumes_by_role)
+    weights = [len(resumes_by_role[role]) for role in roles]
+
+    records = []
+    offset = 0.0
+    for _ in range(n):
+        role = rng.choices(roles, weights)[0]
+        # A share of candidates apply to a role other than their own
+        target_role = role if rng.random() < 0.7 else rng.choice(list(SKILL_MAP))
+        skills = [skill for group in SKILL_MAP[target_role].values() for skill in group]
+        required = rng.sample(skills, k=min(len(skills), rng.randint(4, 8)))
+        job_desc = (
+            f"We are hiring a {target_role}. "
+            f"Required: {', '.join(required[:len(required) // 2])}. "
+            f"Nice to have: {', '.join(required[len(required) // 2:])}."
+        )
+        records.append({
+            "offset": round(offset, 4),
+            "client_id": f"recruiter-{rng.randrange(clients)}",
+            "role": target_role,
+            "resume_text": rng.choice(resumes_by_role[role]),
+            "job_desc": job_desc,
+            "additional_job_info": ""
+        })
+        offset += rng.expovariate(rate)
+    return records
+
+
+def write_traffic(path, records):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def read_traffic(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class InProcessTarget:
+    """
+    One app.py host in-process: requests pass admission control and run as
+    run_analysis_job on a job queue, exactly as the Analyze button does.
+    Returns the outcome: "ok", "degraded" or "rejected_<reason>".
+    """
+
+    def __init__(self, admission=None, queue=None, poll_interval=0.05):
+        from admission import AdmissionController
+        from jobs import JobQueue
+
+        self.admission = admission or AdmissionController()
+        self.queue = queue or JobQueue(io_workers=self.admission.max_concurrent)
+        self.poll_interval = poll_interval
+        self._anonymous = itertools.count()
+
+    def __call__(self, record):
+        from jobs import FINISHED_STATES, DONE
+        from pipeline import run_analysis_job
+
+        client_id = record.get("client_id") or f"anonymous-{next(self._anonymous)}"
+        ticket = self.admission.admit(client_id)
+        if not ticket.accepted:
+            return f"rejected_{ticket.reason}"
+
+        try:
+            job_id = self.queue.submit(
+                self.admission.wrap(ticket, run_analysis_job),
+                None, record["resume_text"], record["role"],
+                record.get("job_desc", ""), record.get("additional_job_info", ""),
+                skip_pdf_report=ticket.skip_pdf_report, skip_job_match=ticket.skip_job_match,
+                cleanup=ticket.release
+            )
+        except BaseException:
+            ticket.release()
+            raise
+
+        while True:
+            status = self.queue.status(job_id)
+            if status["status"] in FINISHED_STATES:
+                break
+            time.sleep(self.poll_interval)
+        if status["status"] != DONE:
+            raise RuntimeError(f"{status['status']}: {status['error']}")
+        return "degraded" if ticket.degraded else "ok"
+
+    def warm_up(self):
+        """
+        Load the models here and in the process pool workers before timing
+        """
+        from jobs import FINISHED_STATES
+        from pipeline import load_models
+
+        load_models()
+        job_ids = [self.queue.submit(_warm_up_job) for _ in range(max(1, self.queue._cpu_workers))]
+        for job_id in job_ids:
+            while self.queue.status(job_id)["status"] not in FINISHED_STATES:
+                time.sleep(self.poll_interval)
+
+    def close(self):
+        self.queue.shutdown()
+
+
+def _load_models_in_worker():
+    from pipeline import load_models
+    load_models()
+
+
+def _warm_up_job(job):
+    job.run_cpu(_load_models_in_worker)
+
+
+def http_target(url, timeout=60):
+    def send(record):
+        request = urllib.request.Request(
+            url, data=json.dumps(record).encode("utf-8"), headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+    return send
+
+
+def _rss_bytes(pid="self"):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        if pid != "self":
+            return 0
+        # ru_maxrss is the peak, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _cpu_seconds(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # utime and stime, after the parenthesised command name
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def _usage():
+    """
+    CPU seconds and RSS of this process plus its live children (the job
+    queue's process pool workers)
+    """
+    children = [child.pid for child in multiprocessing.active_children()]
+    cpu = time.process_time() + sum(_cpu_seconds(pid) for pid in children)
+    rss = _rss_bytes() + sum(_rss_bytes(pid) for pid in children)
+    return cpu, rss
+
+
+class ResourceSampler(threading.Thread):
+    """
+    Samples CPU utilisation and RSS of the process and its pool workers at a
+    fixed interval
+    """
+
+    def __init__(self, interval=0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        started = time.monotonic()
+        last_wall, (last_cpu, _) = started, _usage()
+        while True:
+            stopping = self._stop_event.wait(self.interval)
+            wall, (cpu, rss) = time.monotonic(), _usage()
+            self.samples.append({
+                "t": round(wall - started, 3),
+                # Workers that exit between samples drop out, so this can dip
+                "cpu_percent": round(max(0.0, 100 * (cpu - last_cpu) / max(wall - last_wall, 1e-9)), 1),
+                "rss_mb": round(rss / (1024 * 1024), 1)
+            })
+            last_wall, last_cpu = wall, cpu
+            if stopping:
+                break
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_load(records, target, concurrency=4, rate=None, sample_interval=0.5):
+    """
+    Fire records at target with at most `concurrency` in flight.
+
+    rate=None    - closed loop, each worker sends the next record immediately
+    rate=float   - open loop, Poisson arrivals at that many requests per second
+    rate="replay" - open loop, arrivals at the recorded offsets
+    Latency is measured from the scheduled arrival, so queueing delay counts.
+    target(record) may return an outcome label, None counts as "ok".
+    """
+    if rate == "replay":
+        arrivals = [record.get("offset", 0.0) for record in records]
+    elif rate:
+        rng = np.random.default_rng(0)
+        arrivals = np.cumsum(rng.exponential(1.0 / rate, len(records))).tolist()
+    else:
+        arrivals = [None] * len(records)
+
+    results = [None] * len(records)
+    sampler = ResourceSampler(sample_interval)
+
+    def call(index, scheduled):
+        started = scheduled if scheduled is not None else time.monotonic()
+        error, outcome = None, None
+        try:
+            outcome = target(records[index]) or "ok"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            outcome = "error"
+        results[index] = {"latency": time.monotonic() - started, "error": error, "outcome": outcome}
+
+    sampler.start()
+    run_started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for index, arrival in enumerate(arrivals):
+            scheduled = None
+            if arrival is not None:
+                scheduled = run_started + arrival
+                delay = scheduled - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(call, index, scheduled)
+    duration = time.monotonic() - run_started
+    sampler.stop()
+
+    return summarize(results, duration, sampler.samples, concurrency, rate)
+
+
+def summarize(results, duration, samples, concurrency, rate):
+    # Latency covers served requests only, fast rejections would flatter it
+    latencies = np.array([r["latency"] for r in results if r and r["outcome"] in ("ok", "degraded")])
+    errors = [r["error"] for r in results if r and r["error"] is not None]
+    outcomes = {}
+    for r in results:
+        if r:
+            outcomes[r["outcome"]] = outcomes.get(r["outcome"], 0) + 1
+    rejected = sum(count for outcome, count in outcomes.items() if outcome.startswith("rejected"))
+    percentiles = {}
+    if len(latencies):
+        for p in (50, 90, 95, 99):
+            percentiles[f"p{p}"] = round(float(np.percentile(latencies, p)) * 1000, 1)
+        percentiles["max"] = round(float(latencies.max()) * 1000, 1)
+
+    return {
+        "requests": len(results),
+        "concurrency": concurrency,
+        "rate": rate,
+        "duration_s": round(duration, 2),
+        "throughput_rps": round(len(results) / duration, 2) if duration else 0.0,
+        "served_rps": round(len(latencies) / duration, 2) if duration else 0.0,
+        "error_rate": round(len(errors) / len(results), 4) if results else 0.0,
+        "rejection_rate": round(rejected / len(results), 4) if results else 0.0,
+        "degraded_rate": round(outcomes.get("degraded", 0) / len(results), 4) if results else 0.0,
+        "outcomes": outcomes,
+        "errors": sorted(set(errors))[:10],
+        "latency_ms": percentiles,
+        "peak_rss_mb": max((s["rss_mb"] for s in samples), default=None),
+        "mean_cpu_percent": round(float(np.mean([s["cpu_percent"] for s in samples])), 1) if samples else None,
+        "resource_samples": samples
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Resumify scoring pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    synth = sub.add_parser("synth", help="Synthesize traffic from the training CSV")
+    synth.add_argument("-n", type=int, default=200)
+    synth.add_argument("--rate", type=float, default=2.0, help="Mean arrivals per second")
+    synth.add_argument("--clients", type=int, default=20, help="Distinct recruiters sending the traffic")
+    synth.add_argument("--out", default=DEFAULT_TRAFFIC)
+
+    run = sub.add_parser("run", help="Replay traffic against a target")
+    run.add_argument("--traffic", default=DEFAULT_TRAFFIC)
+    run.add_argument("--target", default="inprocess", help="'inprocess' or an http(s) URL")
+    run.add_argument("--concurrency", type=int, nargs="+", default=[4],
+                     help="One or more concurrency levels to sweep")
+    run.add_argument("--rate", default=None, help="Requests per second, 'replay', or omit for closed loop")
+    run.add_argument("--report", default=None, help="Write the full JSON report here")
+
+    args = parser.parse_args()
+
+    if args.command == "synth":
+        records = synthesize_traffic(args.n, rate=args.rate, clients=args.clients)
+        write_traffic(args.out, records)
+        print(f"Wrote {len(records)} requests to {args.out}")
+        return
+
+    records = read_traffic(args.traffic)
+    rate = args.rate if args.rate in (None, "replay") else float(args.rate)
+    if args.target == "inprocess":
+        # Keep synthetic analyses out of the real history store
+        os.environ.setdefault("RESUMIFY_HISTORY_DB", LOADTEST_HISTORY_DB)
+
+    reports = []
+    for concurrency in args.concurrency:
+        if args.target == "inprocess":
+            # A fresh host per level: no rate-limit or queue state carries over
+            target = InProcessTarget()
+            target.warm_up()
+        else:
+            target = http_target(args.target)
+        try:
+            report = run_load(records, target, concurrency=concurrency, rate=rate)
+        finally:
+            if args.target == "inprocess":
+                target.close()
+        reports.append(report)
+        print(
+            f"concurrency={concurrency} rps={report['throughput_rps']} served_rps={report['served_rps']} "
+            f"errors={report['error_rate']:.2%} rejected={report['rejection_rate']:.2%} "
+            f"degraded={report['degraded_rate']:.2%} latency_ms={report['latency_ms']} "
+            f"cpu={report['mean_cpu_percent']}% rss={report['peak_rss_mb']}MB"
+        )
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
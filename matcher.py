@@ -0,0 +1,164 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+# Keeps skill tokens such as "c++", "c#" and "node.js" intact while
+# dropping the surrounding punctuation that str.split() used to keep.
+TOKEN_PATTERN = r"(?u)\b[a-z0-9][a-z0-9+#]*(?:\.[a-z]+)?"
+
+MODES = ("bm25", "cosine")
+
+# Term statistics (document frequencies, average length) come from a fixed
+# reference corpus, the training resumes, never from the postings being
+# scored: a resume's match against one posting must not depend on which
+# other postings are in the same call.
+REFERENCE_CSV = "data/UpdatedResumeDataSet.csv"
+
+_reference = None
+_reference_lock = threading.Lock()
+
+
+def _make_vectorizer():
+    return CountVectorizer(token_pattern=TOKEN_PATTERN, stop_words='english', lowercase=True)
+
+
+def reference_stats(texts):
+    """
+    Document frequency per term, corpus size and average document length
+    """
+    texts = [text if isinstance(text, str) else "" for text in texts]
+    vectorizer = _make_vectorizer()
+    counts = vectorizer.fit_transform(texts).tocsr()
+    doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+    return {
+        "doc_freq": dict(zip(vectorizer.get_feature_names_out(), doc_freq.tolist())),
+        "n_docs": counts.shape[0],
+        "avg_doc_length": float(counts.sum() / counts.shape[0]) if counts.shape[0] else 0.0
+    }
+
+
+def default_reference(csv_path=REFERENCE_CSV):
+    """
+    Reference statistics from the training resumes, computed once per process
+    """
+    global _reference
+    with _reference_lock:
+        if _reference is None:
+            _reference = reference_stats(pd.read_csv(csv_path)["Resume"])
+        return _reference
+
+
+class MatchScorer:
+    """
+    Score resumes against a fixed set of job descriptions.
+
+    The postings are vectorized once by fit(); every score call is then a
+    single sparse matrix product, so one resume against N postings costs
+    about the same as one resume against a single posting.
+
+    mode="bm25"   - weighted coverage: BM25 weight of the posting terms found
+                    in the resume divided by the total BM25 weight of the posting
+    mode="cosine" - cosine similarity of TF-IDF vectors
+
+    IDF and the BM25 average document length come from `reference`
+    (see reference_stats(), default: the training resumes).
+    """
+
+    def __init__(self, mode="bm25", k1=1.5, b=0.75, reference=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown match mode '{mode}', expected one of {MODES}")
+        self.mode = mode
+        self.k1 = k1
+        self.b = b
+        self.reference = reference
+        self.vectorizer = _make_vectorizer()
+
+    def fit(self, job_descriptions):
+        """
+        Vectorize postings and weight them with the reference statistics.
+        The postings only define which terms are looked up.
+        """
+        reference = self.reference_ = self.reference or default_reference()
+        job_descriptions = [jd or "" for jd in job_descriptions]
+        try:
+            counts = self.vectorizer.fit_transform(job_descriptions).tocsr().astype(np.float64)
+        except ValueError:
+            # Every posting was empty or stop words only
+            self.vectorizer.fit(["placeholder"])
+            counts = sp.csr_matrix((len(job_descriptions), 1), dtype=np.float64)
+
+        n_docs = reference["n_docs"]
+        # Terms the reference never saw get the highest IDF
+        doc_freq = np.array(
+            [reference["doc_freq"].get(term, 0) for term in self.vectorizer.get_feature_names_out()],
+            dtype=np.float64
+        )
+        self.doc_lengths_ = np.asarray(counts.sum(axis=1)).ravel()
+        self.avg_doc_length_ = reference["avg_doc_length"]
+
+        if self.mode == "bm25":
+            self.idf_ = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+            self.weights_ = self._bm25_weights(counts)
+            self.doc_totals_ = np.asarray(self.weights_.sum(axis=1)).ravel()
+        else:
+            self.idf_ = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+            self.weights_ = normalize(counts @ sp.diags(self.idf_))
+            self.doc_totals_ = None
+
+        # Stored transposed so scoring is (resumes x terms) @ (terms x postings)
+        self.weights_t_ = self.weights_.T.tocsr()
+        return self
+
+    def _bm25_weights(self, counts):
+        avgdl = self.avg_doc_length_ or 1.0
+        row_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths_ / avgdl)
+        weights = counts.copy()
+        # Per-entry term frequency saturation, using each entry's row length
+        rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+        tf = weights.data
+        weights.data = self.idf_[weights.indices] * tf * (self.k1 + 1) / (tf + row_norm[rows])
+        return weights
+
+    def _query_matrix(self, resume_texts):
+        resume_texts = [text or "" for text in resume_texts]
+        counts = self.vectorizer.transform(resume_texts)
+        if self.mode == "bm25":
+            # Coverage only asks whether the resume mentions a term
+            counts.data[:] = 1
+            return counts.astype(np.float64)
+        # Normalize over all of the resume's terms, not only the ones the
+        # postings share, so the norm doesn't depend on the batch
+        weighted = counts.astype(np.float64) @ sp.diags(self.idf_)
+        norms = np.array([self._full_norm(text) for text in resume_texts])
+        return sp.diags(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)) @ weighted
+
+    def _full_norm(self, text):
+        reference = self.reference_
+        n_docs = reference["n_docs"]
+        analyzer = self.vectorizer.build_analyzer()
+        terms, tf = np.unique(analyzer(text), return_counts=True)
+        if not len(terms):
+            return 0.0
+        doc_freq = np.array([reference["doc_freq"].get(term, 0) for term in terms], dtype=np.float64)
+        idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+        return float(np.sqrt(np.sum((tf * idf) ** 2)))
+
+    def score_many(self, resume_texts):
+        """
+        Return a (len(resume_texts), n_postings) array of match percentages
+        """
+        raw = (self._query_matrix(resume_texts) @ self.weights_t_).toarray()
+        if self.mode == "bm25":
+            totals = self.doc_totals_
+            raw = np.divide(raw, totals, out=np.zeros_like(raw), where=totals > 0)
+        return np.clip(raw * 100, 0, 100)
+
+    def score(self, resume_text):
+        """
+        Return the match percentage of one resume against every posting
+        """
+        return self.score_many([resume_text])[0]
@@ -0,0 +1,653 @@
+import hashlib
+import pickle
+import re
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import scipy.sparse as sp
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+
+from utils import all_skills, required_skills_for
+from ingest import extract_pdf_text, UploadRejected
+from explain import explain_prediction
+from shadow import get_shadow_scorer
+from history import get_history
+from prototypes import PrototypeClassifier, role_similarities
+from length import LengthBudget, job_budget, truncate_words, chunk_words, pool_counts
+
+# Analysis steps shared by the Streamlit app and the background job workers.
+# Nothing in here may import streamlit: worker processes import this module.
+
+MODEL_DIR = "model"
+
+IMPROVEMENT_TIPS = [
+    "Use action verbs to describe achievements",
+    "Quantify results with specific numbers and metrics",
+    "Keep resume length to 1-2 pages maximum",
+    "Tailor content for each specific job application",
+    "Highlight most relevant experience first",
+    "Include relevant certifications and training"
+]
+
+_models = None
+_NOT_LOADED = object()
+_prototypes = _NOT_LOADED
+
+def read_prototypes(model_dir=MODEL_DIR):
+    """
+    Role prototypes saved by train.py, or None if there are none
+    """
+    try:
+        with open(os.path.join(model_dir, "role_prototypes.pkl"), "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+
+def read_models(model_dir=MODEL_DIR):
+    """
+    Unpickle the TF-IDF vectorizer and classifier from a model directory.
+    Falls back to the role prototypes if the classifier can't be loaded.
+    """
+    with open(os.path.join(model_dir, "tfidf.pkl"), "rb") as f:
+        tfidf = pickle.load(f)
+    try:
+        with open(os.path.join(model_dir, "clf.pkl"), "rb") as f:
+            clf = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        prototypes = read_prototypes(model_dir)
+        if prototypes is None:
+            raise
+        clf = PrototypeClassifier(prototypes)
+    return tfidf, clf
+
+def load_models():
+    """
+    Load (once per process) the TF-IDF vectorizer and classifier
+    """
+    global _models
+    if _models is None:
+        _models = read_models(MODEL_DIR)
+    return _models
+
+def load_prototypes():
+    """
+    Load (once per process) the live model's role prototypes, None if missing
+    """
+    global _prototypes
+    if _prototypes is _NOT_LOADED:
+        _prototypes = read_prototypes(MODEL_DIR)
+    return _prototypes
+
+_model_versions = {}
+
+def model_version(model_dir=MODEL_DIR):
+    """
+    Short content hash identifying the model artifacts in a directory
+    """
+    if model_dir not in _model_versions:
+        digest = hashlib.sha1()
+        for name in ("tfidf.pkl", "clf.pkl"):
+            path = os.path.join(model_dir, name)
+            if os.path.exists(path):
+                digest.update(f"{name}:".encode())
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+        _model_versions[model_dir] = digest.hexdigest()[:12]
+    return _model_versions[model_dir]
+
+def clean_text(text):
+    text = re.sub(r'[^a-zA-Z ]', ' ', text)
+    return text.lower()
+
+def extract_text_from_pdf(upload, limits=None):
+    """
+    Extract text from a SpooledUpload within the ingestion budgets.
+    Returns (text, notes), raises ValueError if the PDF can't be read.
+    """
+    try:
+        return extract_pdf_text(upload, limits)
+    except UploadRejected:
+        raise
+    except Exception as e:
+        raise ValueError(f"Error reading PDF: {e}") from e
+
+def get_project_suggestions(role):
+    """
+    Project ideas for the target role
+    """
+    if role in ["Data Science", "Python Developer"]:
+        return [
+            "Machine learning model with real-world dataset",
+            "Data visualization dashboard using Tableau or Power BI",
+            "Web application using Flask or Django framework",
+            "Automated data pipeline with Python scripts"
+        ]
+    elif role in ["Web Designing"]:
+        return [
+            "Responsive portfolio website with modern design",
+            "E-commerce website template with product catalog",
+            "Web application using React or Vue.js framework",
+            "Website redesign case study with before/after analysis"
+        ]
+    elif role in ["HR"]:
+        return [
+            "Employee onboarding process documentation",
+            "Performance management system design",
+            "HR policy compliance audit report",
+            "Employee engagement survey analysis"
+        ]
+    else:
+        return [
+            "Portfolio showcasing your best work samples",
+            "Case study documenting a successful project",
+            "Technical documentation for a complex process",
+            "Certification in relevant tools or methodologies"
+        ]
+
+def find_skills(text, skills):
+    """
+    Skills mentioned in text (case-insensitive substring match)
+    """
+    text_lower = text.lower()
+    return [skill for skill in skills if skill.lower() in text_lower]
+
+def term_counts(tfidf, text):
+    """
+    Raw term counts of text over the vectorizer's vocabulary, before
+    IDF weighting and normalization
+    """
+    return CountVectorizer.transform(tfidf, [clean_text(text)])
+
+def weight_counts(tfidf, counts):
+    """
+    Apply the vectorizer's TF-IDF weighting and normalization to raw counts,
+    so summed counts of several parts give the same vector as the whole text
+    """
+    counts = sp.csr_matrix(counts, dtype=np.float64)
+    if tfidf.sublinear_tf:
+        counts.data = np.log(counts.data) + 1
+    if tfidf.use_idf:
+        counts = counts.multiply(tfidf.idf_).tocsr()
+    if tfidf.norm:
+        counts = normalize(counts, norm=tfidf.norm)
+    return counts
+
+def budgeted_counts(tfidf, text, budget, label):
+    """
+    Raw term counts of text within a length budget: capped, chunked and the
+    chunks counted as one batch. Returns (counts, kept_text, notes).
+    """
+    kept_text, total_words, kept_words = truncate_words(text, budget.max_tokens)
+    notes = []
+    if kept_words < total_words:
+        notes.append(f"{label} has {total_words:,} words, only the first {kept_words:,} were analyzed")
+    if kept_words <= budget.chunk_tokens:
+        return term_counts(tfidf, kept_text), kept_text, notes
+    chunks = chunk_words(kept_text, budget.chunk_tokens)
+    chunk_counts = CountVectorizer.transform(tfidf, [clean_text(chunk) for chunk in chunks])
+    return pool_counts(chunk_counts, budget.pooling), kept_text, notes
+
+def analyze_resume(resume_text, selected_job_role, job_desc="", additional_job_info="", models=None):
+    """
+    Predict the role and compute the effectiveness score for a resume.
+    models is a (tfidf, clf) pair, defaulting to the live model.
+    """
+    started = time.perf_counter()
+    tfidf, clf = models or load_models()
+    
+    # Clean and vectorize within the length budget
+    counts, resume_text, notes = budgeted_counts(tfidf, resume_text, LengthBudget(), "Resume")
+    vector = weight_counts(tfidf, counts)
+    present = set(find_skills(resume_text, required_skills_for(selected_job_role)))
+    
+    return score_resume(vector, present, selected_job_role, job_desc, additional_job_info, (tfidf, clf), started, notes,
+                        prototypes=load_prototypes() if models is None else None)
+
+def prepare_pdf_part(upload):
+    """
+    Extract a PDF once and keep what re-analysis needs: its text, raw term
+    counts and the skills it mentions (for every role)
+    """
+    text, notes = extract_text_from_pdf(upload)
+    tfidf, _ = load_models()
+    counts, text, length_notes = budgeted_counts(tfidf, text, LengthBudget(), "The PDF resume")
+    return {
+        "text": text,
+        "notes": notes + length_notes,
+        "counts": counts,
+        "words": len(text.split()),
+        "skills": set(find_skills(text, all_skills()))
+    }
+
+def analyze_resume_parts(pdf_part, supplement, selected_job_role, job_desc="", additional_job_info="", models=None):
+    """
+    Same result as analyze_resume() on the PDF text plus the supplement, but
+    only the supplement is cleaned, counted and searched for skills; the PDF
+    counts are summed in and weighted again. Bigrams and skills spanning the
+    boundary between the two parts are not counted.
+    """
+    started = time.perf_counter()
+    tfidf, clf = models or load_models()
+    
+    # One budget for the whole resume: the supplement gets what the PDF left
+    budget = LengthBudget()
+    if pdf_part is not None:
+        budget = LengthBudget(max(0, budget.max_tokens - pdf_part["words"]), budget.chunk_tokens, budget.pooling)
+    counts, supplement, notes = budgeted_counts(tfidf, supplement, budget, "Additional information")
+    present = set(find_skills(supplement, required_skills_for(selected_job_role)))
+    if pdf_part is not None:
+        counts = counts + pdf_part["counts"]
+        present |= pdf_part["skills"]
+    vector = weight_counts(tfidf, counts)
+    
+    return score_resume(vector, present, selected_job_role, job_desc, additional_job_info, (tfidf, clf), started, notes,
+                        prototypes=load_prototypes() if models is None else None)
+
+def score_resume(vector, present, selected_job_role, job_desc, additional_job_info, models, started,
+                 length_notes=(), prototypes=None):
+    """
+    Effectiveness score from a resume's TF-IDF vector and the set of
+    skills it mentions
+    """
+    tfidf, clf = models
+    
+    # Graded similarity to every role from the prototypes (live model only)
+    role_similarity = {}
+    if prototypes is not None:
+        similarities = role_similarities(vector, prototypes)[0]
+        order = np.argsort(similarities)[::-1]
+        role_similarity = {str(prototypes["classes"][i]): float(similarities[i]) for i in order}
+    
+    # Get predicted role
+    predicted_role = clf.predict(vector)[0]
+    explanation = explain_prediction(vector, clf, tfidf, predicted_role, selected_job_role)
+    
+    # Calculate effectiveness score
+    effectiveness = 0
+    
+    # 1. Check role match
+    role_match = predicted_role.lower() == selected_job_role.lower()
+    if role_match:
+        effectiveness += 40
+    
+    # 2. Check skill overlap
+    required_skills = required_skills_for(selected_job_role)
+    present_skills = [skill for skill in required_skills if skill in present]
+    missing_skills = [skill for skill in required_skills if skill not in present]
+    resume_skills_found = len(present_skills)
+    
+    if required_skills:
+        skill_match = (resume_skills_found / len(required_skills)) * 40
+        effectiveness += min(skill_match, 40)
+    
+    # 3. Check job description match
+    desc_score_value = 0
+    if job_desc.strip() or additional_job_info.strip():
+        combined_job_text = job_desc + "\n" + additional_job_info
+        job_counts, _, job_notes = budgeted_counts(tfidf, combined_job_text, job_budget(), "The job description")
+        job_vec = weight_counts(tfidf, job_counts)
+        length_notes = list(length_notes) + job_notes
+        desc_score_value = cosine_similarity(vector, job_vec)[0][0] * 20
+        effectiveness += desc_score_value
+    
+    effectiveness = min(effectiveness, 100)
+    
+    return {
+        "effectiveness": effectiveness,
+        "predicted_role": predicted_role,
+        "target_role": selected_job_role,
+        "required_skills": required_skills,
+        "skills_missing": missing_skills[:12],
+        "present_skills": present_skills,
+        "role_match": role_match,
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "desc_score": desc_score_value,
+        "skill_match_percentage": (resume_skills_found / len(required_skills)) * 40 if required_skills else 0,
+        "explanation": explanation,
+        "analysis_ms": (time.perf_counter() - started) * 1000,
+        "length_notes": list(length_notes),
+        "role_similarity": role_similarity,
+        "target_similarity": role_similarity.get(selected_job_role)
+    }
+
+def create_pdf_report(analysis_data, suggestions, tips):
+    """Create a PDF report with analysis results"""
+    # Create a temporary file
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
+        pdf_path = tmp_file.name
+    
+    # Create PDF
+    c = canvas.Canvas(pdf_path, pagesize=letter)
+    width, height = letter
+    
+    # Title
+    c.setFont("Helvetica-Bold", 24)
+    c.drawString(50, height - 50, "Resume Analysis Report")
+    c.setFont("Helvetica", 10)
+    c.drawString(50, height - 70, f"Generated on: {analysis_data['timestamp']}")
+    
+    # Line separator
+    c.line(50, height - 80, width - 50, height - 80)
+    
+    y_position = height - 100
+    
+    # 1. Overview Section
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(50, y_position, "OVERVIEW")
+    y_position -= 25
+    
+    c.setFont("Helvetica", 12)
+    overview_text = [
+        f"Effectiveness Score: {analysis_data['effectiveness']:.0f}%",
+        f"Predicted Role: {analysis_data['predicted_role']}",
+        f"Target Role: {analysis_data['target_role']}",
+        f"Role Match: {'Yes' if analysis_data['role_match'] else 'No'}"
+    ]
+    
+    for line in overview_text:
+        c.drawString(60, y_position, line)
+        y_position -= 20
+    
+    y_position -= 10
+    
+    # 2. Score Breakdown
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(50, y_position, "SCORE BREAKDOWN")
+    y_position -= 25
+    
+    c.setFont("Helvetica", 12)
+    score_text = [
+        f"Role Match: {'40/40' if analysis_data['role_match'] else '0/40'}",
+        f"Skills Match: {len(analysis_data['present_skills'])}/{len(analysis_data['required_skills'])} skills found ({analysis_data['skill_match_percentage']:.1f}/40)",
+        f"Job Description Match: {analysis_data['desc_score']:.1f}/20"
+    ]
+    
+    for line in score_text:
+        c.drawString(60, y_position, line)
+        y_position -= 20
+    
+    y_position -= 10
+    
+    # 3. Skills Analysis
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(50, y_position, "SKILLS ANALYSIS")
+    y_position -= 25
+    
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(60, y_position, f"Skills Present ({len(analysis_data['present_skills'])}):")
+    y_position -= 20
+    
+    c.setFont("Helvetica", 11)
+    present_text = ', '.join(analysis_data['present_skills'][:8])
+    # Split long text into multiple lines
+    while present_text:
+        c.drawString(70, y_position, present_text[:80])
+        y_position -= 15
+        present_text = present_text[80:]
+    
+    y_position -= 10
+    
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(60, y_position, f"Skills to Add ({len(analysis_data['skills_missing'])}):")
+    y_position -= 20
+    
+    c.setFont("Helvetica", 11)
+    missing_text = ', '.join(analysis_data['skills_missing'][:8])
+    while missing_text:
+        c.drawString(70, y_position, missing_text[:80])
+        y_position -= 15
+        missing_text = missing_text[80:]
+    
+    y_position -= 20
+    
+    # Check if we need a new page
+    if y_position < 100:
+        c.showPage()
+        y_position = height - 50
+        c.setFont("Helvetica", 10)
+        c.drawString(50, height - 30, f"Page 2 - Generated on: {analysis_data['timestamp']}")
+        y_position = height - 80
+    
+    # 4. Project Suggestions
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(50, y_position, "PROJECT SUGGESTIONS")
+    y_position -= 25
+    
+    c.setFont("Helvetica", 11)
+    for suggestion in suggestions[:4]:  # Show first 4 suggestions
+        if y_position < 50:
+            c.showPage()
+            y_position = height - 50
+            c.setFont("Helvetica", 10)
+            c.drawString(50, height - 30, f"Page 3 - Generated on: {analysis_data['timestamp']}")
+            y_position = height - 80
+            c.setFont("Helvetica-Bold", 14)
+            c.drawString(50, y_position, "PROJECT SUGGESTIONS (continued)")
+            y_position -= 25
+            c.setFont("Helvetica", 11)
+        
+        c.drawString(60, y_position, f"• {suggestion}")
+        y_position -= 18
+    
+    y_position -= 10
+    
+    # 5. Improvement Tips
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(50, y_position, "IMPROVEMENT TIPS")
+    y_position -= 25
+    
+    c.setFont("Helvetica", 11)
+    for tip in tips[:6]:  # Show first 6 tips
+        if y_position < 50:
+            c.showPage()
+            y_position = height - 50
+            c.setFont("Helvetica", 10)
+            c.drawString(50, height - 30, f"Page 4 - Generated on: {analysis_data['timestamp']}")
+            y_position = height - 80
+            c.setFont("Helvetica-Bold", 14)
+            c.drawString(50, y_position, "IMPROVEMENT TIPS (continued)")
+            y_position -= 25
+            c.setFont("Helvetica", 11)
+        
+        c.drawString(60, y_position, f"• {tip}")
+        y_position -= 18
+    
+    y_position -= 20
+    
+    # 6. Recommendations
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(50, y_position, "RECOMMENDATIONS")
+    y_position -= 25
+    
+    c.setFont("Helvetica", 11)
+    if analysis_data['effectiveness'] >= 70:
+        recommendations = [
+            "1. Your resume is well-targeted for this role. Keep it updated.",
+            "2. Consider advanced certifications to stand out.",
+            "3. Network with professionals in this field."
+        ]
+    else:
+        recommendations = [
+            "1. Focus on adding missing skills and tailoring content.",
+            "2. Work on projects that demonstrate required skills.",
+            "3. Practice interview questions specific to this role."
+        ]
+    
+    for rec in recommendations:
+        if y_position < 50:
+            c.showPage()
+            y_position = height - 50
+            c.setFont("Helvetica", 10)
+            c.drawString(50, height - 30, f"Page 5 - Generated on: {analysis_data['timestamp']}")
+            y_position = height - 80
+            c.setFont("Helvetica", 11)
+        
+        c.drawString(60, y_position, rec)
+        y_position -= 18
+    
+    # Footer
+    c.setFont("Helvetica-Oblique", 10)
+    c.drawString(width - 200, 30, "Generated by Resumify")
+    
+    # Save PDF
+    c.save()
+    
+    # Read the PDF file
+    with open(pdf_path, 'rb') as f:
+        pdf_bytes = f.read()
+    os.remove(pdf_path)
+    
+    return pdf_bytes
+
+def create_txt_report(analysis_data, suggestions, tips):
+    """Create the plain text version of the analysis report"""
+    return f"""
+RESUME ANALYSIS REPORT
+Generated on: {analysis_data['timestamp']}
+================================================
+
+OVERVIEW
+--------
+Effectiveness Score: {analysis_data['effectiveness']:.0f}%
+Predicted Role: {analysis_data['predicted_role']}
+Target Role: {analysis_data['target_role']}
+Role Match: {'Yes' if analysis_data['role_match'] else 'No'}
+
+SCORE BREAKDOWN
+---------------
+Role Match: {'40/40' if analysis_data['role_match'] else '0/40'}
+Skills Match: {len(analysis_data['present_skills'])}/{len(analysis_data['required_skills'])} skills found ({analysis_data['skill_match_percentage']:.1f}/40)
+Job Description Match: {analysis_data['desc_score']:.1f}/20
+
+SKILLS ANALYSIS
+---------------
+Skills Present ({len(analysis_data['present_skills'])}):
+{', '.join(analysis_data['present_skills'][:10])}
+
+Skills to Add ({len(analysis_data['skills_missing'])}):
+{', '.join(analysis_data['skills_missing'])}
+
+PROJECT SUGGESTIONS
+-------------------
+{chr(10).join(suggestions)}
+
+IMPROVEMENT TIPS
+----------------
+{chr(10).join(tips)}
+
+RECOMMENDATIONS
+---------------
+1. {'Your resume is well-targeted for this role. Keep it updated.' if analysis_data['effectiveness'] >= 70 else 'Focus on adding missing skills and tailoring content.'}
+2. {'Consider advanced certifications to stand out.' if analysis_data['effectiveness'] >= 70 else 'Work on projects that demonstrate required skills.'}
+3. {'Network with professionals in this field.' if analysis_data['effectiveness'] >= 70 else 'Practice interview questions specific to this role.'}
+
+================================================
+Generated by Resumify
+    """
+
+class _LRUCache:
+    """
+    Small thread-safe LRU map for per-document state
+    """
+    
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def put(self, key, value):
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+_pdf_parts = _LRUCache(max_entries=64)
+
+def run_analysis_job(job, upload, resume_text, selected_job_role, job_desc="", additional_job_info="",
+                     skip_pdf_report=False, skip_job_match=False):
+    """
+    Full analysis as a background job: PDF parsing, prediction and reports.
+    CPU-heavy steps go to the job's process pool, progress and partial
+    results are published on the job as each step finishes.
+    skip_pdf_report / skip_job_match shed optional work under overload.
+    """
+    degraded_notes = []
+    if skip_job_match and (job_desc.strip() or additional_job_info.strip()):
+        job_desc, additional_job_info = "", ""
+        degraded_notes.append("High load: the job description match was skipped for this analysis")
+    if skip_pdf_report:
+        degraded_notes.append("High load: the PDF report was skipped, the TXT report is available")
+    
+    ingest_notes = []
+    pdf_part = None
+    if upload is not None:
+        # Re-analyses of the same PDF (e.g. after editing the supplement) skip extraction
+        pdf_part = _pdf_parts.get(upload.digest)
+        if pdf_part is None:
+            job.report(0.1, "Reading PDF")
+            try:
+                pdf_part = job.run_cpu(prepare_pdf_part, upload)
+            except UploadRejected:
+                raise
+            except ValueError as e:
+                # An unreadable PDF only fails the job if there is nothing else to analyze
+                if not resume_text.strip():
+                    raise
+                ingest_notes = [f"{e}. Only the additional information was analyzed."]
+            else:
+                _pdf_parts.put(upload.digest, pdf_part)
+        if pdf_part is not None:
+            ingest_notes = pdf_part["notes"]
+    
+    job.report(0.4, "Scoring resume")
+    supplement = resume_text
+    analysis_data = job.run_cpu(analyze_resume_parts, pdf_part, supplement, selected_job_role, job_desc,
+                                additional_job_info)
+    if pdf_part is not None and pdf_part["text"].strip():
+        resume_text = pdf_part["text"] + "\n\n" + supplement
+    get_shadow_scorer().maybe_submit(resume_text, selected_job_role, job_desc, additional_job_info, analysis_data)
+    suggestions = get_project_suggestions(selected_job_role)
+    tips = list(IMPROVEMENT_TIPS)
+    job.report(0.7, "Building reports", analysis_data=analysis_data, suggestions=suggestions, tips=tips)
+    
+    download_content = create_txt_report(analysis_data, suggestions, tips)
+    pdf_bytes = None
+    if not skip_pdf_report:
+        pdf_bytes = job.run_cpu(create_pdf_report, analysis_data, suggestions, tips)
+    
+    get_history().record(
+        analysis_data, resume_text, job_desc + "\n" + additional_job_info,
+        model_version=model_version(), total_ms=(time.time() - job.started_at) * 1000
+    )
+    
+    return {
+        "analysis_data": analysis_data,
+        "suggestions": suggestions,
+        "tips": tips,
+        "download_content": download_content,
+        "pdf_bytes": pdf_bytes,
+        "ingest_notes": ingest_notes,
+        "degraded_notes": degraded_notes
+    }
@@ -0,0 +1,44 @@
+import numpy as np
+from sklearn.preprocessing import normalize
+
+# Role prototypes: the L2-normalized TF-IDF centroid of each category,
+# computed at training time and saved next to the classifier as
+# model/role_prototypes.pkl ({"classes": [...], "centroids": array}).
+# Since resume vectors are L2-normalized too, one sparse-dense product gives
+# the cosine similarity of a resume to every role.
+
+
+def compute_prototypes(X, y):
+    """
+    Normalized centroid per class of a TF-IDF matrix
+    """
+    y = np.asarray(y)
+    classes = np.unique(y)
+    centroids = np.vstack([np.asarray(X[y == label].mean(axis=0)).ravel() for label in classes])
+    return {"classes": classes, "centroids": normalize(centroids)}
+
+
+def role_similarities(vectors, prototypes):
+    """
+    (n_resumes, n_roles) cosine similarities to each role prototype
+    """
+    return np.asarray(vectors @ prototypes["centroids"].T)
+
+
+class PrototypeClassifier:
+    """
+    Nearest-centroid classifier over role prototypes, used as the fallback
+    when the trained classifier artifact is missing or can't be loaded.
+    Exposes classes_/coef_/intercept_ so explanations work unchanged.
+    """
+
+    def __init__(self, prototypes):
+        self.classes_ = np.asarray(prototypes["classes"])
+        self.coef_ = prototypes["centroids"]
+        self.intercept_ = np.zeros(len(self.classes_))
+
+    def decision_function(self, X):
+        return np.asarray(X @ self.coef_.T)
+
+    def predict(self, X):
+        return self.classes_[self.decision_function(X).argmax(axis=1)]
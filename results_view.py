@@ -0,0 +1,155 @@
+from html import escape
+from string import Template
+
+# HTML for the results section, rendered as a single markdown element per
+# analysis instead of one Streamlit delta per card, pill and list item.
+# Templates are compiled once at import. Lines must not be indented or
+# blank: Markdown would turn them into code blocks or end the HTML block.
+
+RESULTS_TEMPLATE = Template("""<div class="scroll-message">Scroll down to see complete analysis</div>
+<hr>
+<div class="analysis-card">
+<h3>Resume Effectiveness Score</h3>
+<h1 style="color:#1DB954; font-size: 48px; margin: 10px 0;">${effectiveness}%</h1>
+<div class="progress-container"><div class="progress-fill" style="width: ${progress}%"></div></div>
+<div style="display: flex; align-items: center; margin-top: 10px;">
+<span class="match-indicator ${indicator_class}"></span>
+<span style="color:${indicator_color}; font-weight: 500;">${indicator_text}</span>
+</div>
+</div>
+<div class="role-card">
+<h3>Role Analysis</h3>
+<div style="display: grid; grid-template-columns: 1fr 1fr; gap: 20px;">
+<div>
+<p style="color:#b3b3b3; margin-bottom: 5px;">Predicted Role</p>
+<p style="color:#ffffff; font-size: 24px; font-weight: 600;">${predicted_role}</p>
+</div>
+<div>
+<p style="color:#b3b3b3; margin-bottom: 5px;">Target Role</p>
+<p style="color:#ffffff; font-size: 24px; font-weight: 600;">${target_role}</p>
+</div>
+${role_banner}
+${role_similarity}
+</div>
+</div>
+${skills_card}
+<div class="analysis-card">
+<h3>Project Suggestions</h3>
+${projects}
+</div>
+<div class="analysis-card">
+<h3>Improvement Tips</h3>
+${tips}
+</div>
+<hr>
+<div style="text-align: center; padding: 20px;"><h3>Download Analysis Report</h3></div>""")
+
+MISMATCH_TEMPLATE = Template("""<div style="grid-column: span 2; background-color: #ff6b6b15; padding: 15px; border-radius: 8px; margin-top: 15px;">
+<p style="color:#ff6b6b; margin: 0;">Resume better matches <strong>${predicted_role}</strong> roles. Consider tailoring for <strong>${target_role}</strong> positions.</p>
+</div>
+${reasons}""")
+
+MATCH_TEMPLATE = Template("""<div style="grid-column: span 2; background-color: #1DB95415; padding: 15px; border-radius: 8px; margin-top: 15px;">
+<p style="color:#1DB954; margin: 0;">Resume is well-targeted for <strong>${target_role}</strong> roles.</p>
+</div>""")
+
+REASONS_TEMPLATE = Template("""<div style="grid-column: span 2; padding: 0 15px;">${items}</div>""")
+REASON_TEMPLATE = Template("""<p style="color:#b3b3b3; margin: 5px 0;">${text}</p>""")
+
+SIMILARITY_TEMPLATE = Template("""<div style="grid-column: span 2; margin-top: 10px;">
+<p style="color:#b3b3b3; margin: 0;">Similarity to <strong>${target_role}</strong>: ${target_similarity} &middot; Closest roles: ${closest}</p>
+</div>""")
+
+SKILLS_TEMPLATE = Template("""<div class="analysis-card">
+<h3>Skills to Add</h3>
+<p style="color:#b3b3b3; margin-bottom: 15px;">Consider adding these skills to improve your resume:</p>
+<div style="display: flex; flex-wrap: wrap;">${pills}</div>
+</div>""")
+PILL_TEMPLATE = Template("""<span class="skill-pill missing">${skill}</span>""")
+
+PROJECT_TEMPLATE = Template("""<div class="project-item"><p style="margin: 0; color:#ffffff;">${text}</p></div>""")
+TIP_TEMPLATE = Template("""<div class="tip-item"><p style="margin: 0; color:#b3b3b3;">• ${text}</p></div>""")
+
+INDICATORS = (
+    (70, "match-good", "#1DB954", "Strong match for this role"),
+    (40, "match-warning", "#ffa726", "Needs improvement for this role"),
+    (0, "match-bad", "#ff6b6b", "Low match for this role")
+)
+
+
+def _reasons_html(analysis_data, predicted_role, target_role):
+    """
+    Which resume terms drove the prediction, from the linear model's weights
+    """
+    explanation = analysis_data.get("explanation") or {}
+    reasons = []
+    if explanation.get("predicted") and explanation["predicted"]["positive"]:
+        terms = escape(", ".join(term for term, _ in explanation["predicted"]["positive"]))
+        reasons.append(f"Terms pointing to <strong>{predicted_role}</strong>: {terms}")
+    if explanation.get("target") and explanation["target"]["negative"]:
+        terms = escape(", ".join(term for term, _ in explanation["target"]["negative"]))
+        reasons.append(f"Terms counting against <strong>{target_role}</strong>: {terms}")
+    if not reasons:
+        return ""
+    return REASONS_TEMPLATE.substitute(items="".join(REASON_TEMPLATE.substitute(text=r) for r in reasons))
+
+
+def _similarity_html(analysis_data, target_role, top_n=3):
+    """
+    Graded resume-to-role similarity from the role prototypes, if available
+    """
+    role_similarity = analysis_data.get("role_similarity") or {}
+    if not role_similarity:
+        return ""
+    target_similarity = analysis_data.get("target_similarity")
+    closest = list(role_similarity.items())[:top_n]
+    return SIMILARITY_TEMPLATE.substitute(
+        target_role=target_role,
+        target_similarity=f"{target_similarity * 100:.0f}%" if target_similarity is not None else "n/a",
+        closest=", ".join(f"{escape(role)} ({similarity * 100:.0f}%)" for role, similarity in closest)
+    )
+
+
+def render_results_html(result):
+    """
+    Build the complete results section for a finished analysis
+    """
+    analysis_data = result["analysis_data"]
+    effectiveness = analysis_data["effectiveness"]
+    predicted_role = escape(str(analysis_data["predicted_role"]))
+    target_role = escape(analysis_data["target_role"])
+
+    _, indicator_class, indicator_color, indicator_text = next(
+        indicator for indicator in INDICATORS if effectiveness >= indicator[0]
+    )
+
+    if analysis_data["predicted_role"].lower() != analysis_data["target_role"].lower():
+        role_banner = MISMATCH_TEMPLATE.substitute(
+            predicted_role=predicted_role,
+            target_role=target_role,
+            reasons=_reasons_html(analysis_data, predicted_role, target_role)
+        )
+    else:
+        role_banner = MATCH_TEMPLATE.substitute(target_role=target_role)
+
+    missing_skills = analysis_data["skills_missing"][:12]
+    skills_card = ""
+    if missing_skills:
+        skills_card = SKILLS_TEMPLATE.substitute(
+            pills="".join(PILL_TEMPLATE.substitute(skill=escape(skill)) for skill in missing_skills)
+        )
+
+    return RESULTS_TEMPLATE.substitute(
+        effectiveness=f"{effectiveness:.0f}",
+        progress=max(0, min(1, effectiveness / 100)) * 100,
+        indicator_class=indicator_class,
+        indicator_color=indicator_color,
+        indicator_text=indicator_text,
+        predicted_role=predicted_role,
+        target_role=target_role,
+        role_banner=role_banner,
+        role_similarity=_similarity_html(analysis_data, target_role),
+        skills_card=skills_card,
+        projects="".join(PROJECT_TEMPLATE.substitute(text=escape(p)) for p in result["suggestions"]),
+        tips="".join(TIP_TEMPLATE.substitute(text=escape(t)) for t in result["tips"])
+    )
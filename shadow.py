@@ -0,0 +1,198 @@
+import json
+import multiprocessing
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils import env_number
+
+# Shadow scoring for model rollouts. A candidate model (model/candidate/,
+# written by `RESUMIFY_MODEL_OUT=model/candidate python train.py`) scores a
+# sampled share of live requests off the request path. A dispatcher thread
+# hands each sample to a dedicated single-worker process, so the scoring
+# itself never holds the server's GIL. Each comparison is appended to a JSONL log and kept in a bounded
+# in-memory window for summaries.
+#
+# Latency is compared on equal terms: the live request may have used the
+# incremental path (cached PDF counts) on a pool worker, so the shadow
+# process re-times the live model on the same full analyze_resume() path,
+# right before the candidate. Scores are compared against the
+# result the user actually got.
+#
+# Kill switch: set RESUMIFY_SHADOW_DISABLED=1 or create the file
+# model/candidate/DISABLED - checked on every request, no restart needed.
+
+CANDIDATE_DIR = os.environ.get("RESUMIFY_SHADOW_MODEL_DIR", "model/candidate")
+SHADOW_LOG = os.environ.get("RESUMIFY_SHADOW_LOG", "logs/shadow.jsonl")
+
+
+# Candidate models, loaded once per shadow worker process
+_worker_models = {}
+
+
+def _score_in_worker(candidate_dir, resume_text, role, job_desc, additional_job_info):
+    """
+    Runs in the shadow process: time the live model and score with the
+    candidate on the same full path. Returns (live_ms, shadow_analysis).
+    """
+    from pipeline import analyze_resume, load_models, read_models
+
+    if candidate_dir not in _worker_models:
+        _worker_models[candidate_dir] = read_models(candidate_dir)
+    live_full = analyze_resume(resume_text, role, job_desc, additional_job_info, models=load_models())
+    shadow = analyze_resume(resume_text, role, job_desc, additional_job_info, models=_worker_models[candidate_dir])
+    return live_full["analysis_ms"], shadow
+
+
+class ShadowScorer:
+    """
+    Scores sampled requests with a candidate model and logs the comparison
+    """
+
+    def __init__(self, candidate_dir=CANDIDATE_DIR, sample_rate=None, max_pending=32,
+                 max_records=1000, log_path=SHADOW_LOG):
+        self.candidate_dir = candidate_dir
+        self.sample_rate = sample_rate if sample_rate is not None else env_number("RESUMIFY_SHADOW_RATE", 0.1)
+        self.log_path = log_path
+        # Both bounds cap memory: requests beyond max_pending are dropped
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._records = deque(maxlen=max_records)
+        self._executor = None
+        self._disabled = False
+        self._worker = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def enabled(self):
+        if self._disabled or self.sample_rate <= 0:
+            return False
+        if os.environ.get("RESUMIFY_SHADOW_DISABLED"):
+            return False
+        if os.path.exists(os.path.join(self.candidate_dir, "DISABLED")):
+            return False
+        return os.path.exists(os.path.join(self.candidate_dir, "clf.pkl"))
+
+    def disable(self):
+        """
+        Kill switch for this process: stop sampling and drain the queue
+        """
+        self._disabled = True
+        while True:
+            try:
+                self._pending.get_nowait()
+            except queue.Empty:
+                break
+
+    def maybe_submit(self, resume_text, selected_job_role, job_desc, additional_job_info, live_analysis):
+        """
+        Queue a request for shadow scoring if sampled. Never blocks.
+        """
+        if not self.enabled() or random.random() >= self.sample_rate:
+            return False
+        self._ensure_worker()
+        try:
+            self._pending.put_nowait((resume_text, selected_job_role, job_desc, additional_job_info, live_analysis))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, name="resumify-shadow", daemon=True)
+                self._worker.start()
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn, not fork: the host process (e.g. Streamlit) is multi-threaded
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def _work(self):
+        # Only dispatches and records; waiting on the process releases the GIL
+        while True:
+            resume_text, role, job_desc, additional_job_info, live = self._pending.get()
+            if self._disabled:
+                continue
+            try:
+                live_ms, shadow = self._get_executor().submit(
+                    _score_in_worker, self.candidate_dir, resume_text, role, job_desc, additional_job_info
+                ).result()
+                self._record(live, shadow, live_ms)
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    # The shadow process died; start a fresh one for the next sample
+                    self._executor.shutdown(wait=False)
+                    self._executor = None
+                self.failed += 1
+                self._record_error(e)
+
+    def _record(self, live, shadow, live_ms):
+        record = {
+            "timestamp": time.time(),
+            "target_role": live["target_role"],
+            "live_role": str(live["predicted_role"]),
+            "shadow_role": str(shadow["predicted_role"]),
+            "role_agrees": live["predicted_role"] == shadow["predicted_role"],
+            "live_score": float(live["effectiveness"]),
+            "shadow_score": float(shadow["effectiveness"]),
+            "score_delta": float(shadow["effectiveness"] - live["effectiveness"]),
+            "live_ms": round(live_ms, 2),
+            "shadow_ms": round(shadow["analysis_ms"], 2)
+        }
+        self._records.append(record)
+        self._write(record)
+
+    def _record_error(self, error):
+        self._write({"timestamp": time.time(), "error": f"{type(error).__name__}: {error}"})
+
+    def _write(self, record):
+        if not self.log_path:
+            return
+        os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def summary(self):
+        """
+        Aggregates over the in-memory window of recent comparisons
+        """
+        records = list(self._records)
+        n = len(records)
+        if not n:
+            return {"compared": 0, "submitted": self.submitted, "dropped": self.dropped, "failed": self.failed}
+        return {
+            "compared": n,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "role_agreement": sum(r["role_agrees"] for r in records) / n,
+            "mean_score_delta": sum(r["score_delta"] for r in records) / n,
+            "mean_abs_score_delta": sum(abs(r["score_delta"]) for r in records) / n,
+            "mean_live_ms": sum(r["live_ms"] for r in records) / n,
+            "mean_shadow_ms": sum(r["shadow_ms"] for r in records) / n
+        }
+
+
+_shadow_scorer = None
+_shadow_lock = threading.Lock()
+
+
+def get_shadow_scorer():
+    """
+    Process-wide shadow scorer
+    """
+    global _shadow_scorer
+    with _shadow_lock:
+        if _shadow_scorer is None:
+            _shadow_scorer = ShadowScorer()
+        return _shadow_scorer
@@ -0,0 +1,86 @@
+from admission import AdmissionController
+
+
+def make_controller(**kwargs):
+    options = dict(max_concurrent=2, max_queue=4, client_rate=1000, client_burst=1000)
+    options.update(kwargs)
+    return AdmissionController(**options)
+
+
+def test_slots_are_counted_and_released():
+    controller = make_controller()
+    tickets = [controller.admit(f"client-{i}") for i in range(3)]
+    assert all(ticket.accepted for ticket in tickets)
+    assert controller.load()["in_flight"] == 3
+    assert controller.load()["running"] == 2
+    assert controller.load()["queued"] == 1
+
+    for ticket in tickets:
+        ticket.release()
+    assert controller.load()["in_flight"] == 0
+
+
+def test_double_release_frees_one_slot():
+    controller = make_controller()
+    first = controller.admit("a")
+    controller.admit("b")
+    first.release()
+    first.release()
+    assert controller.load()["in_flight"] == 1
+
+
+def test_load_shedding_thresholds():
+    controller = make_controller(shed_report_at=0.0, shed_match_at=0.5)
+    running = [controller.admit(f"run-{i}") for i in range(2)]
+    assert not any(ticket.degraded for ticket in running)
+
+    # 1 of 4 queue places taken: only the PDF report is shed
+    first_queued = controller.admit("queued-1")
+    assert first_queued.skip_pdf_report and not first_queued.skip_job_match
+
+    # 2 of 4: job matching is shed as well
+    second_queued = controller.admit("queued-2")
+    assert second_queued.skip_pdf_report and second_queued.skip_job_match
+    assert controller.load()["degraded"] == 2
+
+
+def test_rejects_when_queue_is_full():
+    controller = make_controller()
+    for i in range(6):
+        assert controller.admit(f"client-{i}").accepted
+    ticket = controller.admit("late")
+    assert not ticket.accepted
+    assert ticket.reason == "overloaded"
+    assert ticket.retry_after > 0
+    assert controller.load()["in_flight"] == 6
+
+
+def test_rate_limit_per_client():
+    controller = make_controller(client_rate=0.001, client_burst=1)
+    assert controller.admit("a").accepted
+    limited = controller.admit("a")
+    assert not limited.accepted
+    assert limited.reason == "rate_limited"
+    assert limited.retry_after > 0
+    # Other clients have their own bucket
+    assert controller.admit("b").accepted
+
+
+def test_overloaded_rejection_refunds_the_token():
+    controller = make_controller(max_concurrent=1, max_queue=0, client_rate=0.001, client_burst=1)
+    holder = controller.admit("holder")
+    assert holder.accepted
+
+    assert controller.admit("a").reason == "overloaded"
+    holder.release()
+    # The overloaded attempt didn't use up the client's only token
+    assert controller.admit("a").accepted
+
+
+def test_wrap_records_service_start():
+    controller = make_controller()
+    ticket = controller.admit("a")
+    wrapped = controller.wrap(ticket, lambda job, value: value * 2)
+    assert ticket.started_at is None
+    assert wrapped(None, 21) == 42
+    assert ticket.started_at is not None
@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from history import AnalysisHistory
+
+
+def analysis(**overrides):
+    data = {
+        "target_role": "Data Science",
+        "predicted_role": "Data Science",
+        "role_match": True,
+        "effectiveness": 72.5,
+        "skill_match_percentage": 20.0,
+        "desc_score": 12.5,
+        "required_skills": ["Python", "SQL", "Statistics"],
+        "present_skills": ["Python"],
+        "skills_missing": ["SQL"],
+        "analysis_ms": 3.0
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.fixture
+def history(tmp_path):
+    store = AnalysisHistory(str(tmp_path / "history.sqlite3"), batch_size=100, flush_interval=3600)
+    yield store
+    store.close()
+
+
+def test_failed_flush_puts_rows_back(history, monkeypatch):
+    history.record(analysis(), "resume one")
+    history.record(analysis(), "resume two")
+
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(history, "_connect", locked)
+    with pytest.raises(sqlite3.OperationalError):
+        history.flush()
+    assert len(history._buffer) == 2
+
+    monkeypatch.undo()
+    assert history.flush() == 2
+    assert len(history.query()) == 2
+
+
+def test_requeued_rows_stay_bounded(history, monkeypatch):
+    history.max_buffer = 3
+    monkeypatch.setattr(history, "_connect", lambda: (_ for _ in ()).throw(sqlite3.OperationalError("disk full")))
+    for i in range(5):
+        history.record(analysis(), f"resume {i}")
+    with pytest.raises(sqlite3.OperationalError):
+        history.flush()
+    assert len(history._buffer) == 3
+    assert history.dropped == 2
+
+
+def test_unavailable_store_never_raises_on_record(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    store = AnalysisHistory(str(blocker / "history.sqlite3"), batch_size=1, flush_interval=3600)
+    store.record(analysis(), "resume")
+    store.close()
+    assert len(store._buffer) == 1
+
+
+def test_stores_every_missing_skill(history):
+    history.record(analysis(), "resume")
+    row = history.query()[0]
+    assert row["missing_skills"] == ["SQL", "Statistics"]
+    assert row["present_skills"] == ["Python"]
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+
+from jobs import JobQueue, DONE, FAILED, CANCELLED, TIMEOUT, FINISHED_STATES
+
+
+def wait_for(queue, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = queue.status(job_id)
+        if status["status"] in FINISHED_STATES:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class CleanupCounter:
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+
+
+def until_stopped(job):
+    # Cooperative loop: only stops through cancel or timeout
+    while True:
+        job.report(0.5, "Working")
+        time.sleep(0.01)
+
+
+def double(value):
+    return value * 2
+
+
+def kill_worker():
+    os._exit(9)
+
+
+def test_result_and_cleanup_once():
+    queue = JobQueue(io_workers=2, cpu_workers=0)
+    cleanup = CleanupCounter()
+    job_id = queue.submit(lambda job, value: job.run_cpu(double, value), 21, cleanup=cleanup)
+    status = wait_for(queue, job_id)
+    assert status["status"] == DONE
+    assert status["result"] == 42
+    assert cleanup.calls == 1
+    queue.shutdown()
+
+
+def test_failure_runs_cleanup_once():
+    queue = JobQueue(io_workers=1, cpu_workers=0)
+    cleanup = CleanupCounter()
+
+    def fail(job):
+        raise ValueError("bad input")
+
+    status = wait_for(queue, queue.submit(fail, cleanup=cleanup))
+    assert status["status"] == FAILED
+    assert status["error"] == "bad input"
+    assert cleanup.calls == 1
+    queue.shutdown()
+
+
+def test_cancel_running_job():
+    queue = JobQueue(io_workers=1, cpu_workers=0)
+    cleanup = CleanupCounter()
+    job_id = queue.submit(until_stopped, cleanup=cleanup)
+    while queue.status(job_id)["status"] != "running":
+        time.sleep(0.01)
+    assert queue.cancel(job_id)
+    assert wait_for(queue, job_id)["status"] == CANCELLED
+    assert cleanup.calls == 1
+    # Finished jobs can't be cancelled again
+    assert not queue.cancel(job_id)
+    queue.shutdown()
+
+
+def test_cancel_queued_job_never_runs_it():
+    queue = JobQueue(io_workers=1, cpu_workers=0)
+    release = threading.Event()
+    blocker = queue.submit(lambda job: release.wait(10))
+    ran = threading.Event()
+    cleanup = CleanupCounter()
+    job_id = queue.submit(lambda job: ran.set(), cleanup=cleanup)
+
+    assert queue.cancel(job_id)
+    release.set()
+    assert wait_for(queue, blocker)["status"] == DONE
+    assert wait_for(queue, job_id)["status"] == CANCELLED
+    assert not ran.is_set()
+    assert cleanup.calls == 1
+    queue.shutdown()
+
+
+def test_timeout():
+    queue = JobQueue(io_workers=1, cpu_workers=0)
+    cleanup = CleanupCounter()
+    status = wait_for(queue, queue.submit(until_stopped, timeout=0.2, cleanup=cleanup))
+    assert status["status"] == TIMEOUT
+    assert cleanup.calls == 1
+    queue.shutdown()
+
+
+def test_timeout_while_queued():
+    queue = JobQueue(io_workers=1, cpu_workers=0)
+    release = threading.Event()
+    queue.submit(lambda job: release.wait(10))
+    cleanup = CleanupCounter()
+    job_id = queue.submit(lambda job: "too late", timeout=0.05, cleanup=cleanup)
+    time.sleep(0.1)
+    release.set()
+    status = wait_for(queue, job_id)
+    assert status["status"] == TIMEOUT
+    assert "queue" in status["error"]
+    assert cleanup.calls == 1
+    queue.shutdown()
+
+
+def test_process_pool_recovers_from_a_killed_worker():
+    queue = JobQueue(io_workers=2, cpu_workers=1)
+    assert wait_for(queue, queue.submit(lambda job: job.run_cpu(kill_worker)))["status"] == FAILED
+    status = wait_for(queue, queue.submit(lambda job: job.run_cpu(double, 4)))
+    assert status["status"] == DONE
+    assert status["result"] == 8
+    queue.shutdown()
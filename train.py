@@ -1,5 +1,3 @@
-import pandas as pd
-import re
 import pickle
 import numpy as np
 
@@ -10,40 +8,18 @@ from sklearn.metrics import accuracy_score, classification_report, confusion_mat
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-def clean_text(text):
-    """
-    Enhanced text cleaning for resume data
-    """
-    if not isinstance(text, str):
-        return ""
-    
-    # Remove URLs
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text)
-    
-    # Remove special characters but keep important punctuation for skills
-    text = re.sub(r'[^a-zA-Z0-9\s.,!?()\-\+&/]', ' ', text)
-    
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Convert to lowercase
-    text = text.lower()
-    
-    return text.strip()
-
-# Load data
+from dataset import load_dataset
+from prototypes import compute_prototypes, PrototypeClassifier
+
+# Load data (cleaned text comes from the dataset cache, see dataset.py)
 print("Loading data...")
-df = pd.read_csv("data/UpdatedResumeDataSet.csv")
+df = load_dataset("data/UpdatedResumeDataSet.csv")
 
 # Check data
 print(f"Total samples: {len(df)}")
 print(f"Categories: {df['Category'].unique()}")
 print(f"Class distribution:\n{df['Category'].value_counts()}")
 
-# Clean text
-print("Cleaning text...")
-df['Cleaned_Resume'] = df['Resume'].apply(clean_text)
-
 # Handle empty texts
 df = df[df['Cleaned_Resume'].str.len() > 50]
 
@@ -104,16 +80,26 @@ print(f"Accuracy: {accuracy:.4f}")
 print("\nClassification Report:")
 print(classification_report(y_test, y_pred))
 
+# Role prototypes: normalized TF-IDF centroid per category, for graded
+# role similarity and as the fallback scorer (see prototypes.py)
+print("\nComputing role prototypes...")
+prototypes = compute_prototypes(X_train, y_train)
+prototype_accuracy = accuracy_score(y_test, PrototypeClassifier(prototypes).predict(X_test))
+print(f"Prototype fallback accuracy: {prototype_accuracy:.4f}")
+
 # Save model and vectorizer
-print("\nSaving model...")
+# RESUMIFY_MODEL_OUT=model/candidate saves a candidate for shadow scoring (see shadow.py)
 import os
-os.makedirs("model", exist_ok=True)
+model_dir = os.environ.get("RESUMIFY_MODEL_OUT", "model")
+print(f"\nSaving model to {model_dir}/...")
+os.makedirs(model_dir, exist_ok=True)
 
-pickle.dump(tfidf, open("model/tfidf.pkl", "wb"))
-pickle.dump(clf, open("model/clf.pkl", "wb"))
+pickle.dump(tfidf, open(os.path.join(model_dir, "tfidf.pkl"), "wb"))
+pickle.dump(clf, open(os.path.join(model_dir, "clf.pkl"), "wb"))
+pickle.dump(prototypes, open(os.path.join(model_dir, "role_prototypes.pkl"), "wb"))
 
 # Save label mapping for reference
 label_mapping = {i: label for i, label in enumerate(y.unique())}
-pickle.dump(label_mapping, open("model/label_mapping.pkl", "wb"))
+pickle.dump(label_mapping, open(os.path.join(model_dir, "label_mapping.pkl"), "wb"))
 
 print("Model training completed and saved!")
\ No newline at end of file
@@ -1,3 +1,5 @@
+import os
+
 SKILL_MAP = {
     "Data Science": {
         "Core": ["Python", "Machine Learning", "Statistics", "SQL", "Data Visualization"],
@@ -41,6 +43,31 @@ SKILL_MAP = {
     }
 }
 
+def required_skills_for(role):
+    """
+    All SKILL_MAP skills for a role, core first
+    """
+    required_skills = []
+    if role in SKILL_MAP:
+        for skill_list in SKILL_MAP[role].values():
+            required_skills.extend(skill_list)
+    return required_skills
+
+def all_skills():
+    """
+    Every distinct skill in SKILL_MAP, in first-seen order
+    """
+    return list(dict.fromkeys(skill for role in SKILL_MAP for skill in required_skills_for(role)))
+
+def env_number(name, default, cast=float):
+    """
+    Numeric setting from an environment variable, default if unset or invalid
+    """
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return default
+
 def get_suggestions(role, resume_text):
     """
     Get skill suggestions for improvement based on role
@@ -75,24 +102,27 @@ def get_suggestions(role, resume_text):
     
     return suggestions[:10]  # Limit to top 10 suggestions
 
-def calculate_match_score(resume_text, job_description):
+def calculate_match_score(resume_text, job_description, mode="bm25"):
     """
     Calculate match percentage between resume and job description
     """
     if not job_description or not resume_text:
         return 0
     
-    # Simple keyword matching (can be enhanced)
-    job_words = set(job_description.lower().split())
-    resume_words = set(resume_text.lower().split())
-    
-    if not job_words:
-        return 0
+    return float(calculate_match_scores(resume_text, [job_description], mode=mode)[0])
+
+def calculate_match_scores(resume_text, job_descriptions, mode="bm25"):
+    """
+    Calculate match percentages between one resume and many job descriptions
+    in a single sparse matrix product
+    """
+    from matcher import MatchScorer
     
-    common_words = job_words.intersection(resume_words)
-    match_percentage = (len(common_words) / len(job_words)) * 100
+    if not job_descriptions:
+        return []
     
-    return min(match_percentage, 100)  # Cap at 100%
+    scorer = MatchScorer(mode=mode).fit(job_descriptions)
+    return scorer.score(resume_text or "").tolist()
 
 def extract_keywords(text, top_n=10):
     """